@@ -6,7 +6,7 @@ export async function post(path, data, config) {
     const url = `${ADDRESS}${path}`
     try {
         const response = await axios.post(url, data, config)
-        if (response.status === 201 || response.status === 200) {
+        if (response.status === 201 || response.status === 200 || response.status === 202) {
             return {
                 value: true,
                 data: response.data,
@@ -0,0 +1,73 @@
+"""
+Parity check and comparison of the Keras and NumPy inference backends on a trained model,
+parity.py checks the parity without one.
+
+Usage (from the repository's root, <path> being a folder of server/model/output):
+    python server/benchmarks/backend.py <path> [lang]
+"""
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+SERVER = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVER))
+
+from model.registry import OUTPUT_PATH  # noqa: E402
+
+STARTUP = {
+    'keras': 'from tensorflow.keras.models import load_model; model = load_model("{folder}/model_{lang}.h5")',
+    'numpy': 'from model.backend import NumpyModel; model = NumpyModel.load("{folder}/model_{lang}.npz")',
+}
+
+MEMORY = '; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)'
+
+
+def startup(backend, folder, lang):
+    code = f'import sys; sys.path.insert(0, "{SERVER}"); ' + STARTUP[backend].format(folder=folder, lang=lang)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code + MEMORY], check=True, capture_output=True, text=True)
+    return time.perf_counter() - start, int(output.stdout.split()[-1]) / 1024
+
+
+def latency(model, inputs, repeat):
+    model.predict(inputs)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(inputs)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    path = sys.argv[1]
+    lang = sys.argv[2] if len(sys.argv) > 2 else 'en'
+    folder = f'{OUTPUT_PATH}/{path}'
+
+    from tensorflow.keras.models import load_model
+    from model.backend import NumpyModel
+
+    models = {
+        'keras': load_model(f'{folder}/model_{lang}.h5'),
+        'numpy': NumpyModel.load(f'{folder}/model_{lang}.npz'),
+    }
+
+    # PARITY
+    size = models['keras'].input_shape[1]
+    inputs = (np.random.default_rng(0).random((1024, size)) < .05).astype(np.float32)
+    difference = np.abs(models['keras'].predict(inputs) - models['numpy'].predict(inputs)).max()
+    assert difference < 1e-5, f'backends disagree by {difference}'
+    print(f'parity: max absolute difference {difference:.2e}')
+
+    for backend, model in models.items():
+        single = latency(model, inputs[:1], 200)
+        batch = latency(model, inputs[:256], 20)
+        seconds, megabytes = startup(backend, folder, lang)
+        print(f'{backend:>6}: single {single * 1e3:.3f}ms, batch of 256 {256 / batch:.0f} rows/s, '
+              f'startup {seconds:.2f}s, max RSS {megabytes:.0f}MB')
+
+
+if __name__ == '__main__':
+    main()
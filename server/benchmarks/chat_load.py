@@ -0,0 +1,106 @@
+"""
+Load test of the chat's inference path with micro-batching on and off,
+then check that the requests holding a bundle released while they run (promotion, invalidation) are all answered.
+
+Usage (from the repository's root, <path> being a folder of server/model/output):
+    python server/benchmarks/chat_load.py <path> [lang] [threads] [requests per thread]
+"""
+import random
+import sys
+import threading
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+# THE MODEL PACKAGE IMPORTS server.database, FROM THE REPOSITORY'S ROOT
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from model import batching  # noqa: E402
+from model.registry import registry  # noqa: E402
+from model.use import predict_class  # noqa: E402
+
+
+def run(path, lang, threads, requests):
+    registry.invalidate()
+    bundle = registry.get(path, lang)
+    messages = [' '.join(random.sample(bundle.words, min(4, len(bundle.words)))) for _ in range(100)]
+    # WARM UP
+    predict_class(messages[0], bundle, bundle.featurizer, bundle.classes)
+
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            predict_class(random.choice(messages), bundle, bundle.featurizer, bundle.classes)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'p50': np.percentile(latencies, 50) * 1e3,
+        'p99': np.percentile(latencies, 99) * 1e3,
+        'rps': len(latencies) / elapsed,
+    }
+
+
+def close_under_load(path, lang, threads, requests, timeout=30):
+    """
+    Release a bundle while threads are predicting with it, as ModelRegistry.invalidate does.
+
+    :return: the number of requests answered, the threads still blocked after @timeout seconds
+    """
+    registry.invalidate()
+    bundle = registry.get(path, lang)
+    messages = [' '.join(random.sample(bundle.words, min(4, len(bundle.words)))) for _ in range(100)]
+    answered = []
+
+    def worker():
+        for _ in range(requests):
+            predict_class(random.choice(messages), bundle, bundle.featurizer, bundle.classes)
+            answered.append(1)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(.05)
+    registry.invalidate(path)
+    deadline = time.monotonic() + timeout
+    for thread in workers:
+        thread.join(max(0., deadline - time.monotonic()))
+    return len(answered), sum(thread.is_alive() for thread in workers)
+
+
+def main():
+    path = sys.argv[1]
+    lang = sys.argv[2] if len(sys.argv) > 2 else 'en'
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    requests = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+
+    for enabled in [False, True]:
+        batching.configure(enabled=enabled)
+        result = run(path, lang, threads, requests)
+        print(f'batching={"on " if enabled else "off"} threads={threads} '
+              f'p50={result["p50"]:.1f}ms p99={result["p99"]:.1f}ms rps={result["rps"]:.0f}')
+
+    answered, blocked = close_under_load(path, lang, threads, requests)
+    print(f'closed under load: {answered}/{threads * requests} answered, {blocked} threads blocked')
+    assert blocked == 0, 'requests submitted to a closed batcher never returned'
+    registry.invalidate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare the legacy nested-loop bag-of-words encoding with the indexed featurizer.
+
+Usage (from the repository's root):
+    python server/benchmarks/featurizer.py
+"""
+import random
+import string
+import sys
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from model.featurizer import Featurizer  # noqa: E402
+
+VOCABULARY_SIZES = [100, 1000, 5000, 20000]
+DOCUMENTS = 500
+TOKENS_PER_DOCUMENT = 8
+
+
+def legacy_inference(tokens, words):
+    input_representation = np.zeros(len(words))
+    for input_word in tokens:
+        for index, word in enumerate(words):
+            if input_word == word:
+                input_representation[index] = 1
+    return input_representation
+
+
+def legacy_training(documents, words):
+    training = []
+    for document in documents:
+        input_representation = np.zeros(len(words))
+        for word in words:
+            if word in document:
+                input_representation[words.index(word)] = 1
+        training.append(input_representation)
+    return np.array(training)
+
+
+def random_word():
+    return ''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 10)))
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    random.seed(0)
+    print(f'{"words":>8} {"legacy 1":>12} {"indexed 1":>12} {"legacy batch":>14} {"indexed batch":>14}')
+    for size in VOCABULARY_SIZES:
+        words = sorted({random_word() for _ in range(size)})
+        documents = [random.sample(words, TOKENS_PER_DOCUMENT) for _ in range(DOCUMENTS)]
+        featurizer = Featurizer(words)
+
+        legacy_one, expected = measure(legacy_inference, documents[0], words)
+        indexed_one, actual = measure(featurizer.vectorize_tokens, documents[:1])
+        assert np.array_equal(expected, actual[0])
+
+        # THE LEGACY TRAINING LOOP IS QUADRATIC IN THE VOCABULARY, KEEP IT BOUNDED
+        batch = documents if size <= 5000 else documents[:50]
+        legacy_batch, expected = measure(legacy_training, batch, words)
+        indexed_batch, actual = measure(featurizer.vectorize_tokens, batch)
+        assert np.array_equal(expected, actual)
+
+        print(f'{len(words):>8} {legacy_one * 1e3:>10.3f}ms {indexed_one * 1e3:>10.3f}ms '
+              f'{legacy_batch * 1e3:>12.1f}ms {indexed_batch * 1e3:>12.1f}ms  ({len(batch)} documents)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Seed a synthetic corpus into a Postgres database, then record the plan and the latency of each endpoint's main query
+with and without the indexes of the models.
+
+The tables of the database are dropped and recreated, use a throwaway database.
+
+Usage (from the repository's root):
+    python server/benchmarks/indexes.py <database uri> [contributions] [output.json]
+"""
+import datetime
+import json
+import random
+import sys
+import time
+
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from database.models import *  # noqa: E402
+
+LANGUAGES = ['en', 'fr', 'ar']
+PATTERNS = 5
+RESPONSES = 2
+RELATED = 2
+RUNS = 20
+BATCH_SIZE = 10000
+
+
+def insert(table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        database.session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+
+
+def seed(count):
+    """
+    :param count: number of contributions
+    :return: None
+    """
+    random.seed(0)
+    role = Role(label='administrator')
+    database.session.add(role)
+    database.session.flush()
+    users = [User(username=f'user-{index}', role_id=role.id) for index in range(100)]
+    database.session.add_all(users)
+    database.session.flush()
+
+    start = datetime.datetime(2019, 1, 1)
+    insert(Contribution.__table__, [{
+        'id': index + 1,
+        'title': f'contribution {index}',
+        'status': random.choice(['pending', 'valid', 'valid', 'valid', 'invalid']),
+        'contributor_id': random.choice(users).id,
+        'created_at': start + datetime.timedelta(minutes=random.randrange(3 * 365 * 24 * 60)),
+    } for index in range(count)])
+    insert(Context.__table__, [{
+        'id': index + 1,
+        'code': f'context-{index}',
+        'label_en': f'context {index}',
+        'contribution_id': index + 1,
+    } for index in range(count)])
+    insert(Pattern.__table__, [{
+        'label': f'pattern {index} {number}',
+        'language': lang,
+        'context_id': index + 1,
+    } for index in range(count) for lang in LANGUAGES for number in range(PATTERNS)])
+    insert(Response.__table__, [{
+        'label': f'response {index} {number}',
+        'language': lang,
+        'context_id': index + 1,
+    } for index in range(count) for lang in LANGUAGES for number in range(RESPONSES)])
+    insert(related_contexts, [{
+        'main_context_id': index + 1,
+        'related_context_id': related_id,
+    } for index in range(count) for related_id in set(random.sample(range(1, count + 1), RELATED)) - {index + 1}])
+    insert(Model.__table__, [{
+        'path': f'model-{index}',
+        'state': 'enabled' if index < 2 else 'disabled',
+        'tag': ['dev', 'prod'][index] if index < 2 else 'none',
+        'user_id': users[0].id,
+    } for index in range(200)])
+    database.session.commit()
+    database.session.execute(text('ANALYZE'))
+    database.session.commit()
+
+
+def queries(count):
+    """
+    :param count: number of contributions
+    :return: a dictionary in the format of { name: query }, the main query of each endpoint
+    """
+    page = list(range(count // 2, count // 2 + 50))
+    return {
+        'contributions by status (/contexts/<status>)': Contribution.query.filter_by(
+            status='pending').filter(Contribution.id > count // 2).order_by(Contribution.id).limit(51),
+        'contexts of a page (/contributions)': Context.query.filter(Context.contribution_id.in_(page)),
+        'patterns of a page (/contributions)': Pattern.query.filter(Pattern.context_id.in_(page)),
+        'responses of a language (chat)': Response.query.filter(
+            Response.context_id.in_(page), Response.language == 'fr'),
+        'corpus of a language (training)': database.session.query(
+            Context.label_fr, Pattern.label
+        ).join(Contribution, Context.contribution_id == Contribution.id).outerjoin(
+            Pattern, (Pattern.context_id == Context.id) & (Pattern.language == 'fr')
+        ).filter(Contribution.status == 'valid'),
+        'contributions per month (/statistics)': database.session.query(
+            extract('month', Contribution.created_at), func.count(Contribution.id)
+        ).filter(
+            Contribution.created_at >= datetime.datetime(2020, 1, 1),
+            Contribution.created_at < datetime.datetime(2021, 1, 1),
+        ).group_by(extract('month', Contribution.created_at)),
+        'contributions per language (/statistics)': database.session.query(
+            Pattern.language, func.count(distinct(Context.contribution_id))
+        ).join(Context, Pattern.context_id == Context.id).group_by(Pattern.language),
+        'served model (chat)': Model.query.filter_by(state='enabled', tag='prod'),
+        'contexts linking to a context (delete)': database.session.query(related_contexts).filter(
+            related_contexts.c.related_context_id == count // 2),
+    }
+
+
+def measure(count):
+    """
+    :param count: number of contributions
+    :return: a dictionary in the format of { name: { 'plan': '', 'latency': 0 } }, the latency's median in ms
+    """
+    results = dict()
+    for name, query in queries(count).items():
+        sql = str(query.statement.compile(dialect=database.engine.dialect, compile_kwargs={'literal_binds': True}))
+        plan = database.session.execute(text(f'EXPLAIN {sql}')).fetchall()
+        latencies = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            database.session.execute(text(sql)).fetchall()
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            'plan': '\n'.join(row[0] for row in plan),
+            'latency': sorted(latencies)[len(latencies) // 2],
+        }
+    return results
+
+
+def main():
+    uri = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    output = sys.argv[3] if len(sys.argv) > 3 else None
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database.init_app(app)
+    app.app_context().push()
+    database.drop_all()
+    database.create_all()
+
+    start = time.perf_counter()
+    seed(count)
+    print(f'seeded {count} contributions in {time.perf_counter() - start:.1f}s')
+
+    indexed = measure(count)
+    for table in database.metadata.tables.values():
+        for index in table.indexes:
+            index.drop(bind=database.engine)
+    database.session.execute(text('ANALYZE'))
+    database.session.commit()
+    unindexed = measure(count)
+
+    for name in indexed:
+        print(f'{name:<50} {unindexed[name]["latency"]:>9.2f}ms -> {indexed[name]["latency"]:>9.2f}ms')
+        print('    ' + indexed[name]['plan'].replace('\n', '\n    '))
+    if output:
+        with open(output, 'w') as file:
+            json.dump({'contributions': count, 'indexed': indexed, 'unindexed': unindexed}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
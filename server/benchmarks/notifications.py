@@ -0,0 +1,108 @@
+"""
+Delivery of the cache invalidation notifications (Postgres NOTIFY) to several serving processes:
+every process must receive every notification published by another one, and only once,
+and every notification must bump the versions of its tables (cache_versions) as the routes publishing it do.
+
+Usage (from the repository's root, against a running Postgres):
+    python server/benchmarks/notifications.py <database uri> [processes] [notifications]
+"""
+import multiprocessing
+import sys
+import time
+
+from pathlib import Path
+
+# THE LISTENER'S HANDLERS IMPORT server.database, FROM THE REPOSITORY'S ROOT
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+EVENTS = ['contributions', 'users', 'roles', 'models_added']
+
+
+def create_app(uri):
+    from flask import Flask
+    from database.models import database
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database.init_app(app)
+    return app
+
+
+def serve(uri, ready, received, stop):
+    from listener import listener
+
+    app = create_app(uri)
+    listener.ensure_started(app)
+    # THE LISTENER NEEDS A MOMENT TO CONNECT
+    time.sleep(1)
+    ready.set()
+    count = 0
+    while not stop.is_set():
+        if listener.received != count:
+            count = listener.received
+            received.put((multiprocessing.current_process().name, count, time.time()))
+        time.sleep(.001)
+
+
+def main():
+    uri = sys.argv[1]
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    notifications = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    # SPAWNED, EACH PROCESS HAS ITS OWN ORIGIN
+    context = multiprocessing.get_context('spawn')
+    received = context.Queue()
+    stop = context.Event()
+    servers = []
+    for index in range(processes):
+        ready = context.Event()
+        server = context.Process(target=serve, args=(uri, ready, received, stop), name=f'server-{index}')
+        server.start()
+        servers.append((server, ready))
+    for server, ready in servers:
+        ready.wait()
+
+    from database.models import database, CacheVersion
+    from database.notifications import publish, TABLES
+
+    app = create_app(uri)
+    latencies = []
+    counts = dict()
+    with app.app_context():
+        CacheVersion.__table__.create(bind=database.engine, checkfirst=True)
+        before = {row.name: row.version for row in CacheVersion.query.all()}
+        database.session.remove()
+        for index in range(notifications):
+            publish(EVENTS[index % len(EVENTS)])
+            sent_at = time.time()
+            database.session.commit()
+            pending = processes
+            while pending:
+                name, count, received_at = received.get(timeout=10)
+                counts[name] = count
+                latencies.append(received_at - sent_at)
+                pending -= 1
+        after = {row.name: row.version for row in CacheVersion.query.all()}
+    stop.set()
+    for server, ready in servers:
+        server.join()
+
+    latencies.sort()
+    print(f'{processes} processes, {notifications} notifications')
+    print(f'received per process: {sorted(counts.values())} (expected {notifications} each)')
+    print(f'delivery p50={latencies[len(latencies) // 2] * 1e3:.1f}ms '
+          f'p99={latencies[int(len(latencies) * .99)] * 1e3:.1f}ms')
+    assert all(count == notifications for count in counts.values()), 'a process missed or repeated a notification'
+    expected = dict()
+    for index in range(notifications):
+        for table in TABLES[EVENTS[index % len(EVENTS)]]:
+            expected[table] = expected.get(table, 0) + 1
+    bumps = {table: after.get(table, 0) - before.get(table, 0) for table in expected}
+    print(f'versions bumped: {bumps} (expected {expected})')
+    assert bumps == expected, 'a notification did not bump the versions of its tables'
+
+
+if __name__ == '__main__':
+    main()
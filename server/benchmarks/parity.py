@@ -0,0 +1,64 @@
+"""
+Parity check of the NumPy inference backend, without a trained model:
+builds a network shaped like train_model's with random weights, exports it with export_weights
+and compares NumpyModel's output (read and memory-mapped) with Keras's.
+
+Usage (from the repository's root):
+    python server/benchmarks/parity.py [inputs] [classes]
+"""
+import os
+import sys
+import tempfile
+
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from model.backend import NumpyModel, export_weights  # noqa: E402
+
+TOLERANCE = 1e-5
+
+
+def build_model(inputs, classes):
+    """
+    :param inputs: size of the vocabulary
+    :param classes: number of classes
+    :return: a Keras model with the layers of train_model's and random weights (non-zero biases)
+    """
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Dropout
+
+    model = Sequential()
+    model.add(Dense(128, input_shape=(inputs,)))
+    model.add(Dropout(.8))
+    model.add(Dense(512, activation='relu'))
+    model.add(Dropout(.8))
+    model.add(Dense(classes, activation='softmax'))
+
+    rng = np.random.default_rng(0)
+    model.set_weights([rng.normal(scale=.1, size=weight.shape).astype(np.float32) for weight in model.get_weights()])
+    return model
+
+
+def main():
+    inputs = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    classes = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    model = build_model(inputs, classes)
+    # BAGS OF WORDS, AS Featurizer.transform BUILDS THEM
+    rows = (np.random.default_rng(1).random((256, inputs)) < .05).astype(np.float32)
+    expected = model.predict(rows, verbose=0)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'model.npz')
+        export_weights(model, path)
+        for mmap in [False, True]:
+            difference = np.abs(NumpyModel.load(path, mmap=mmap).predict(rows) - expected).max()
+            print(f'{"mmap" if mmap else "read"}: max absolute difference {difference:.2e}')
+            assert difference < TOLERANCE, f'the NumPy backend ({"mmap" if mmap else "read"}) disagrees by {difference}'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Chat latency around a model promotion: a background promotion (load, warm, swap) against
+the previous behavior (drop the bundles, the next message loads the new model).
+
+The serving pointer expires every TTL seconds (ModelRegistry.SERVING_TTL, shortened so that it always expires
+during the promotion): the chat path then reads the promoted model's path from the database.
+'unpinned' is the background promotion without ModelRegistry.begin_promotion, the messages reading
+the database load the promoted model themselves.
+
+Usage (from the repository's root, <old> and <new> being folders of server/model/output):
+    python server/benchmarks/promotion.py <old> <new> [lang] [threads] [seconds]
+"""
+import random
+import sys
+import threading
+import time
+
+from pathlib import Path
+
+import numpy as np
+
+# THE MODEL PACKAGE IMPORTS server.database, FROM THE REPOSITORY'S ROOT
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from model.registry import registry  # noqa: E402
+from model.use import predict_class  # noqa: E402
+
+MODES = ['invalidation', 'unpinned', 'hot promotion']
+
+# SECONDS, THE POINTER EXPIRES WHILE THE NEW MODEL LOADS
+TTL = .05
+
+
+def run(old, new, lang, threads, seconds, mode):
+    registry.invalidate()
+    registry.promote('prod', old, [lang])
+    words = registry.get(old, lang).words
+    messages = [' '.join(random.sample(words, min(4, len(words)))) for _ in range(100)]
+
+    # THE PATH generate_response READS FROM THE DATABASE WHEN THE POINTER IS UNKNOWN OR EXPIRED
+    database = {'prod': old}
+    latencies = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            path = registry.serving('prod')
+            if path is None:
+                generation = registry.generation
+                path = database['prod']
+                registry.serve('prod', path, generation)
+            bundle = registry.get(path, lang)
+            predict_class(random.choice(messages), bundle, bundle.featurizer, bundle.classes)
+            local.append((start, time.perf_counter() - start))
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    time.sleep(seconds / 2)
+    promoted_at = time.perf_counter()
+    database['prod'] = new
+    if mode == 'invalidation':
+        registry.invalidate(old)
+    else:
+        if mode == 'hot promotion':
+            registry.begin_promotion('prod', new)
+        threading.Thread(target=registry.promote, args=('prod', new, [lang])).start()
+    time.sleep(seconds / 2)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    registry.end_promotion('prod', new)
+
+    before = [latency for start, latency in latencies if start < promoted_at]
+    after = [latency for start, latency in latencies if promoted_at <= start < promoted_at + 1]
+    return {
+        'before': np.percentile(before, 99) * 1e3,
+        'after': np.percentile(after, 99) * 1e3 if after else float('nan'),
+        'max': max(latency for _, latency in latencies) * 1e3,
+    }
+
+
+def main():
+    old, new = sys.argv[1], sys.argv[2]
+    lang = sys.argv[3] if len(sys.argv) > 3 else 'en'
+    threads = int(sys.argv[4]) if len(sys.argv) > 4 else 16
+    seconds = float(sys.argv[5]) if len(sys.argv) > 5 else 6
+
+    registry.SERVING_TTL = TTL
+    for mode in MODES:
+        result = run(old, new, lang, threads, seconds, mode)
+        print(f'{mode:<13} p99 before={result["before"]:.1f}ms '
+              f'p99 first second after={result["after"]:.1f}ms max={result["max"]:.1f}ms')
+    registry.invalidate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Count the queries issued to serialize the contributions listing for a growing number of rows.
+
+The count is a constant plus one query per SELECTIN_CHUNK rows for each selectin-loaded relationship
+of the contexts (patterns, responses): SQLAlchemy splits the IN lists of selectinload in chunks of 500.
+
+Usage (from the repository's root):
+    python server/benchmarks/queries.py
+"""
+import math
+import sys
+
+from pathlib import Path
+
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from database.models import *  # noqa: E402
+from database.serialization import Serializer, context_graph  # noqa: E402
+
+SIZES = [10, 100, 1000]
+
+# SQLALCHEMY'S SelectInLoader._chunksize
+SELECTIN_CHUNK = 500
+# Context.patterns, Context.responses
+SELECTIN_RELATIONSHIPS = 2
+
+
+def seed(count, offset):
+    role = Role.query.first()
+    users = [User(username=f'user-{offset + index}', role_id=role.id) for index in range(3)]
+    database.session.add_all(users)
+    database.session.flush()
+    contexts = []
+    for index in range(count):
+        context = Context(
+            code=f'context-{offset + index}',
+            label_en=f'context {offset + index}',
+            patterns=[Pattern(label='hello', language='en'), Pattern(label='salut', language='fr')],
+            responses=[Response(label='hi', language='en')],
+            contexts=contexts[-2:],
+        )
+        contexts.append(context)
+        database.session.add(Contribution(
+            title='title',
+            contributor_id=users[index % 3].id,
+            validator_id=users[(index + 1) % 3].id,
+            context=context,
+        ))
+    database.session.commit()
+
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database.init_app(app)
+    app.app_context().push()
+    database.create_all()
+    database.session.add(Role(label='administrator', permissions=[Permission(label='contexts')]))
+    database.session.commit()
+
+    statements = []
+    event.listen(database.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    total = 0
+    counts = []
+    for size in SIZES:
+        seed(size - total, total)
+        total = size
+        database.session.expunge_all()
+        context_graph.invalidate()
+
+        statements.clear()
+        contributions = database.session.query(Contribution).all()
+        Serializer().contributions(contributions)
+        counts.append(len(statements))
+        print(f'{size:>6} contributions: {len(statements)} queries')
+
+    for size, count in zip(SIZES, counts):
+        bound = counts[0] + SELECTIN_RELATIONSHIPS * (math.ceil(size / SELECTIN_CHUNK) - 1)
+        assert count <= bound, f'{count} queries for {size} contributions, expected at most {bound}'
+
+
+if __name__ == '__main__':
+    main()
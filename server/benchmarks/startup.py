@@ -0,0 +1,65 @@
+"""
+Cold-start time and resident memory of the dashboard application (app.py) and the chat-only application (chat.py),
+each measured in a fresh interpreter.
+
+Usage (from the repository's root):
+    python server/benchmarks/startup.py [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+from pathlib import Path
+
+SERVER = str(Path(__file__).resolve().parents[1])
+
+MODES = {
+    'dashboard': 'import app',
+    'chat': 'from chat import create_chat_app; create_chat_app()',
+}
+
+HEAVY_MODULES = ['tensorflow', 'pandas', 'nltk', 'numpy', 'alembic']
+
+PROBE = '''
+import json, sys, time
+sys.path.insert(0, {server!r})
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+rss = 0
+with open('/proc/self/status') as file:
+    for line in file:
+        if line.startswith('VmRSS:'):
+            rss = int(line.split()[1]) / 1024
+print(json.dumps({{
+    'seconds': seconds,
+    'rss': rss,
+    'modules': [name for name in {modules!r} if name in sys.modules],
+}}))
+'''
+
+
+def measure(statement):
+    """
+    :param statement: the statement creating the application
+    :return: a dictionary in the format of { 'seconds': 0, 'rss': 0, 'modules': [] }, rss in MB
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(server=SERVER, statement=statement, modules=HEAVY_MODULES)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for mode, statement in MODES.items():
+        results = [measure(statement) for _ in range(runs)]
+        print(f'{mode:<10} startup {statistics.median(r["seconds"] for r in results):.2f}s '
+              f'rss {statistics.median(r["rss"] for r in results):.0f}MB '
+              f'heavy modules {results[0]["modules"]}')
+
+
+if __name__ == '__main__':
+    main()
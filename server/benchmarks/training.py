@@ -0,0 +1,75 @@
+"""
+Wall-clock comparison of the serial and the parallel per-language training.
+
+Usage (from the repository's root, with the database running):
+    python server/benchmarks/training.py <database uri> [output.json]
+"""
+import json
+import os
+import shutil
+import sys
+import time
+
+from pathlib import Path
+
+from flask import Flask
+
+# THE MODEL PACKAGE IMPORTS server.database, FROM THE REPOSITORY'S ROOT
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.database.models import database  # noqa: E402
+from model.dataset import extract_corpus  # noqa: E402
+from model.jobs import LANGUAGES, OUTPUT_PATH, train_languages  # noqa: E402
+
+
+def serial(folder_name, corpus):
+    from model.train import train_model
+    for lang in LANGUAGES:
+        train_model(lang, folder_name, dataset=corpus[lang])
+
+
+def main():
+    uri = sys.argv[1]
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database.init_app(app)
+    with app.app_context():
+        corpus = extract_corpus(LANGUAGES)
+
+    folders = ['benchmark-parallel', 'benchmark-serial']
+    for folder in folders:
+        os.makedirs(f'{OUTPUT_PATH}/{folder}', exist_ok=True)
+
+    # THE WORKERS ARE SPAWNED, THE ORDER OF THE RUNS DOES NOT MATTER
+    start = time.perf_counter()
+    states = train_languages(folders[0], corpus)
+    parallel_time = time.perf_counter() - start
+    assert set(states.values()) == {'completed'}, states
+
+    start = time.perf_counter()
+    serial(folders[1], corpus)
+    serial_time = time.perf_counter() - start
+
+    for folder in folders:
+        shutil.rmtree(f'{OUTPUT_PATH}/{folder}', ignore_errors=True)
+
+    results = {
+        'cpus': os.cpu_count(),
+        'patterns': {lang: len(corpus[lang]['documents']) for lang in LANGUAGES},
+        'serial': serial_time,
+        'parallel': parallel_time,
+        'speedup': serial_time / parallel_time,
+    }
+    print(f'{results["cpus"]} cpus, patterns {results["patterns"]}')
+    print(f'serial: {serial_time:.1f}s, parallel: {parallel_time:.1f}s, speedup: {results["speedup"]:.2f}x')
+    if output:
+        with open(output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Memory of the chat workers of gunicorn.conf.py with the models preloaded by the master (shared)
+and loaded by each worker (copied), for 1, 4 and 16 workers.
+
+The enabled models must have NumPy artifacts (model_<lang>.npz) and the database must be running.
+
+Usage (from the repository's root):
+    python server/benchmarks/workers.py [requests per worker]
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+WORKERS = [1, 4, 16]
+PORT = 5077
+LANGUAGES = ['en', 'fr', 'ar']
+TAGS = ['prod', 'dev']
+
+
+def chat(lang, tag):
+    query = urllib.parse.urlencode({'lang': lang, 'tag': tag, 'user-input': 'hello'})
+    try:
+        urllib.request.urlopen(f'http://127.0.0.1:{PORT}/?{query}', timeout=30).read()
+    except urllib.error.HTTPError:
+        # A TAG WITHOUT AN ENABLED MODEL ANSWERS 400
+        pass
+
+
+def wait_until_ready(timeout=120):
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        try:
+            chat(LANGUAGES[0], TAGS[0])
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(.5)
+    raise TimeoutError('the server did not start')
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as file:
+        return [int(child) for child in file.read().split()]
+
+
+def memory(pid):
+    """
+    :param pid: a worker's pid
+    :return: a dictionary in the format of { 'pss': 0, 'uss': 0, 'rss': 0 }, in MB
+    """
+    values = dict()
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        'pss': values['Pss'],
+        'uss': values['Private_Clean'] + values['Private_Dirty'],
+        'rss': values['Rss'],
+    }
+
+
+def measure(workers, preload, requests):
+    env = dict(os.environ, CHAT_WORKERS=str(workers), CHAT_PRELOAD='1' if preload else '0',
+               CHAT_BIND=f'127.0.0.1:{PORT}')
+    server = subprocess.Popen(['gunicorn', '-c', 'server/gunicorn.conf.py'], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready()
+        # EVERY WORKER SERVES EVERY MODEL AT LEAST ONCE (MOST LIKELY)
+        for _ in range(requests * workers):
+            for lang in LANGUAGES:
+                for tag in TAGS:
+                    chat(lang, tag)
+        results = [memory(pid) for pid in children(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+    return {key: sum(result[key] for result in results) / len(results) for key in ['pss', 'uss', 'rss']}
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print(f'{"workers":>7} {"mode":<8} {"pss/worker":>11} {"uss/worker":>11} {"rss/worker":>11} {"total pss":>10}')
+    for workers in WORKERS:
+        for preload in [True, False]:
+            result = measure(workers, preload, requests)
+            print(f'{workers:>7} {"shared" if preload else "copied":<8} {result["pss"]:>9.1f}MB '
+                  f'{result["uss"]:>9.1f}MB {result["rss"]:>9.1f}MB {result["pss"] * workers:>8.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import functools
+import threading
+import uuid
+
+from collections import OrderedDict
+from flask import request, make_response
+from database.models import CacheVersion
+
+# TABLES THE BODY OF EACH CACHED RESOURCE IS SERIALIZED FROM
+RESOURCES = {
+    'contributions': ['contributions', 'users', 'roles'],
+    'models': ['models', 'users', 'roles'],
+    'contexts': ['contributions'],
+    'roles': ['roles'],
+}
+
+MAX_ENTRIES = 256
+
+# HEADERS OF A LISTING THAT ARE PART OF ITS BODY
+KEPT_HEADERS = ['X-Next-Cursor']
+
+
+class ResponseCache:
+    """
+    The serialized bodies of the read endpoints keyed by the versions of the tables they were built from.
+
+    The versions are stored in the database (CacheVersion) and bumped in the transaction of every write,
+    so an ETag issued by any process matches in every other one.
+    They are kept in memory: read once, then advanced by the notifications of the other processes (@advance),
+    the writes of this process (@discard) and a reconnection of the listener (@forget_versions) read them again.
+    """
+
+    def __init__(self):
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = None
+        self._stale = set()
+        self._forgotten = 0
+
+    def discard(self, *tables):
+        """
+        Free the bodies built from changed tables, their ETags will not be issued again,
+        the versions of the tables are read again by the next request.
+
+        :param tables: names of the changed tables
+        :return: None
+        """
+        resources = [resource for resource, sources in RESOURCES.items() if set(sources) & set(tables)]
+        with self._lock:
+            self._stale.update(tables)
+            for etag in list(self._bodies):
+                if etag.split('-', 1)[0] in resources:
+                    del self._bodies[etag]
+
+    def advance(self, versions):
+        """
+        :param versions: a dictionary in the format of { 'table': version }, carried by a notification
+        :return: None
+        """
+        with self._lock:
+            if self._versions is None:
+                return
+            self._versions = dict(self._versions)
+            for table, version in versions.items():
+                self._versions[table] = max(self._versions.get(table, 0), version)
+                self._stale.discard(table)
+
+    def forget_versions(self):
+        """
+        The notifications may have been missed, read every version again on the next request.
+
+        :return: None
+        """
+        with self._lock:
+            self._versions = None
+            self._forgotten += 1
+
+    def versions(self):
+        """
+        :return: a dictionary in the format of { 'table': version }, read from the database when unknown
+        """
+        with self._lock:
+            versions = self._versions
+            if versions is not None and not self._stale:
+                return versions
+            stale = set(self._stale)
+            forgotten = self._forgotten
+        # A CHANGE NOTIFIED WHILE THE VERSIONS ARE READ IS ALREADY COMMITTED, THE READ INCLUDES IT
+        versions = read_versions()
+        with self._lock:
+            # VERSIONS FORGOTTEN DURING THE READ ARE READ AGAIN BY THE NEXT REQUEST
+            if forgotten == self._forgotten:
+                self._versions = versions
+                self._stale -= stale
+        return versions
+
+    def etag(self, resource, key, versions):
+        """
+        :param resource: a key of RESOURCES
+        :param key: the request's path and query string
+        :param versions: a dictionary in the format of { 'table': version }, see @versions
+        :return: the ETag of the resource's current version
+        """
+        versions = '.'.join(str(versions.get(table, 0)) for table in RESOURCES[resource])
+        return f'{resource}-{versions}-{uuid.uuid5(uuid.NAMESPACE_URL, key).hex[:16]}'
+
+    def get(self, etag):
+        """
+        :param etag: an ETag returned by @etag
+        :return: the body and the headers saved for this ETag, None if there is none
+        """
+        with self._lock:
+            entry = self._bodies.get(etag)
+            if entry is not None:
+                self._bodies.move_to_end(etag)
+            return entry
+
+    def put(self, etag, body, headers):
+        with self._lock:
+            self._bodies[etag] = (body, headers)
+            self._bodies.move_to_end(etag)
+            while len(self._bodies) > MAX_ENTRIES:
+                self._bodies.popitem(last=False)
+
+
+response_cache = ResponseCache()
+
+
+def read_versions():
+    """
+    :return: a dictionary in the format of { 'table': version }, a table never changed has no version
+    """
+    return {row.name: row.version for row in CacheVersion.query.all()}
+
+
+def cached(resource):
+    """
+    Decorator of the read endpoints of @resource:
+    answers If-None-Match with 304 and serves the saved body of the current version without running the endpoint.
+
+    :param resource: a key of RESOURCES
+    :return: the decorator
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # THE VERSIONS ARE READ BEFORE THE DATABASE, A WRITE COMMITTED MEANWHILE CHANGES THE NEXT ETAG
+            etag = response_cache.etag(resource, request.full_path, response_cache.versions())
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                entry = response_cache.get(etag)
+                if entry is not None:
+                    response = make_response(entry[0], 200)
+                    response.mimetype = 'application/json'
+                    response.headers.extend(entry[1])
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.put(etag, response.get_data(), [
+                        (header, response.headers[header]) for header in KEPT_HEADERS if header in response.headers
+                    ])
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+import gc
+
+from flask import Blueprint, Flask, jsonify
+from flask import request
+from flask_cors import CORS
+
+import listener
+from config import configure
+from database.models import Model, database
+from server.database.models import database as model_database
+from model.use import generate_response, exact_match_stats
+from model.registry import registry
+from model.contexts import context_tables
+
+LANGUAGES = ['en', 'fr', 'ar']
+
+chat_blueprint = Blueprint('chat', __name__)
+
+
+# CHAT
+@chat_blueprint.route('/', methods=['GET'])
+def chat():
+    lang = request.args.get('lang')
+    user_input = request.args.get('user-input')
+    tag = request.args.get('tag')
+
+    try:
+        response = generate_response(user_input=user_input, lang=lang, tag=tag)
+        return response, 200
+    except ModuleNotFoundError as exception:
+        return 'noModel', 400
+    except Exception as exception:
+        return 'responseError', 400
+
+
+# EXACT-MATCH FAST PATH STATS OF THE WORKER ANSWERING THE REQUEST, THE CHAT TRAFFIC IS COUNTED WHERE IT IS SERVED
+@chat_blueprint.route('/statistics/exact-match', methods=['GET'])
+def exact_match_statistics():
+    if request.method == 'GET':
+        return jsonify(exact_match_stats()), 200
+
+
+def create_chat_app():
+    """
+    Chat-only application: serves GET / without importing the dashboard's routes or the training code,
+    and without touching the schema.
+
+    :return: the Flask application
+    """
+    app = Flask(__name__)
+    CORS(app)
+    configure(app)
+    listener.init_app(app)
+    app.register_blueprint(chat_blueprint)
+    return app
+
+
+def preload_models():
+    """
+    Load the enabled models (dev and prod) and their contexts, then freeze the loaded objects,
+    called once in the master process of a pre-forking server (gunicorn.conf.py):
+    the memory-mapped weights and the frozen objects are shared by the workers instead of being copied.
+
+    :return: the loaded bundles' names
+    """
+    paths = [model.path for model in Model.query.filter_by(state='enabled').all()]
+    bundles = registry.preload(paths, LANGUAGES)
+    for bundle in bundles:
+        context_tables.get(bundle.path, bundle.lang, bundle.classes)
+    database.session.remove()
+    # THE CONTEXT TABLES ARE READ WITH THE SESSION OF THE MODEL PACKAGE, IT MUST NOT BE INHERITED EITHER
+    model_database.session.remove()
+    # THE WORKERS OPEN THEIR OWN CONNECTIONS
+    database.engine.dispose()
+    # THE GARBAGE COLLECTOR NO LONGER WRITES TO THE PAGES OF THE PRELOADED OBJECTS
+    gc.collect()
+    gc.freeze()
+    return [f'{bundle.path}/{bundle.lang}' for bundle in bundles]
@@ -0,0 +1,60 @@
+from sqlalchemy import bindparam
+from .models import *
+
+
+def find_contexts(codes):
+    """
+    :param codes: contexts' codes
+    :return: the contexts having these codes, in the same order, unknown codes are ignored
+    """
+    if not codes:
+        return []
+    contexts = {context.code: context for context in Context.query.filter(Context.code.in_(codes)).all()}
+    return [contexts[code] for code in dict.fromkeys(codes) if code in contexts]
+
+
+def add_items(model, context_id, items):
+    """
+    Insert patterns/responses in a single statement.
+
+    :param model: Pattern or Response
+    :param context_id: the items' context
+    :param items: a list in the format of [{ 'label': '', 'language': '' }]
+    :return: None
+    """
+    if items:
+        database.session.execute(model.__table__.insert(), [{
+            'label': item['label'],
+            'language': item['language'],
+            'context_id': context_id,
+        } for item in items])
+
+
+def apply_changes(model, context_id, items):
+    """
+    Apply the edited, deleted and added patterns/responses of a contribution,
+    one statement per kind of change whatever the number of items.
+
+    :param model: Pattern or Response
+    :param context_id: the contribution's context, items of other contexts are left untouched
+    :param items: a list in the format of [{ 'id': 0, 'label': '', 'language': '', 'status': 'edit|delete|add' }]
+    :return: None
+    """
+    edited = [item for item in items if item['status'] == 'edit']
+    deleted = [item['id'] for item in items if item['status'] == 'delete']
+    added = [item for item in items if item['status'] == 'add']
+
+    table = model.__table__
+    if edited:
+        database.session.execute(
+            table.update().where(
+                (table.c.id == bindparam('item_id')) & (table.c.context_id == context_id)
+            ).values(label=bindparam('item_label'), language=bindparam('item_language')),
+            [{'item_id': item['id'], 'item_label': item['label'], 'item_language': item['language']}
+             for item in edited]
+        )
+    if deleted:
+        database.session.execute(
+            table.delete().where(table.c.id.in_(deleted) & (table.c.context_id == context_id))
+        )
+    add_items(model, context_id, added)
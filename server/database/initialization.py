@@ -1,69 +1,231 @@
+import itertools
 import json
+import time
 from .models import *
 from pathlib import Path
-import pandas as pd
 
 
-def save_data(data, lang):
-    for index in reversed(range(len(data))):
-        context = dict()
-        patterns = []
-        responses = []
-        contexts = []
+LANGUAGES = ['en', 'fr', 'ar']
 
-        current_context = data[index]
-        context['code'] = current_context['code']
-        context[f'label_{lang}'] = current_context['tag']
-        context[f'proposition_{lang}'] = current_context['proposition'] if not pd.isnull(
-            current_context['proposition']) else None
-
-        for label in current_context['patterns']:
-            patterns.append(Pattern(label=label, language=lang))
-        for label in current_context['responses']:
-            responses.append(Response(label=label, language=lang))
-        for code in current_context['to']:
-            c = Context.query.filter_by(code=code).first()
-            if c is not None:
-                contexts.append(c)
+REQUIRED_KEYS = ['code', 'tag', 'patterns', 'responses', 'to']
 
-        # GET ADMINISTRATOR
-        admin = database.session.query(User).filter_by(username='belkacem').first()
-        # SAVE CONTRIBUTION
-        contribution = Contribution(
+EXPORT_BATCH_SIZE = 500
+
+
+def read_records(stream, ndjson):
+    """
+    :param stream: the uploaded file
+    :param ndjson: whether the upload has one context per line (NDJSON) or is a JSON array
+    :return: an iterator over the uploaded contexts
+    """
+    if not ndjson:
+        yield from json.load(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def save_data(data, lang, dry_run=False):
+    """
+    Import contexts in a single transaction:
+    validate them, insert contributions/contexts/patterns/responses in batches,
+    then link the related contexts using a code -> id map built in memory.
+
+    :param data: an iterable of contexts in the format of
+                 { 'code': '', 'tag': '', 'proposition': '', 'patterns': [], 'responses': [], 'to': [] }
+    :param lang: contexts' language
+    :param dry_run: validate the data and roll back instead of committing
+    :return: a report in the format of { 'contexts': 0, ..., 'errors': [], 'rowsPerSecond': 0 }
+    """
+    # PANDAS IS ONLY IMPORTED WHEN DATA IS IMPORTED/SEEDED
+    import pandas as pd
+
+    if lang not in LANGUAGES:
+        raise ValueError(f'unsupported language: {lang}')
+    start = time.monotonic()
+
+    # ONE QUERY FOR EVERY EXISTING CODE
+    ids = {code: id for code, id in database.session.query(Context.code, Context.id).all()}
+    errors = []
+    records = []
+    codes = set()
+    for index, record in enumerate(data):
+        missing = [key for key in REQUIRED_KEYS if key not in record]
+        if missing:
+            errors.append({'index': index, 'error': f'missing keys: {missing}'})
+        elif record['code'] in ids or record['code'] in codes:
+            errors.append({'index': index, 'error': f'duplicated code: {record["code"]}'})
+        else:
+            codes.add(record['code'])
+            records.append(record)
+
+    report = {
+        'contexts': len(records),
+        'patterns': sum(len(record['patterns']) for record in records),
+        'responses': sum(len(record['responses']) for record in records),
+        'relations': 0,
+        'errors': errors,
+        'dryRun': dry_run,
+    }
+    if errors:
+        return report
+
+    # GET ADMINISTRATOR
+    admin = database.session.query(User).filter_by(username='belkacem').first()
+    # SAVE CONTRIBUTIONS
+    contexts = []
+    for record in records:
+        context = Context(
+            code=record['code'],
+            patterns=[Pattern(label=label, language=lang) for label in record['patterns']],
+            responses=[Response(label=label, language=lang) for label in record['responses']],
+        )
+        setattr(context, f'label_{lang}', record['tag'])
+        setattr(context, f'proposition_{lang}',
+                record['proposition'] if not pd.isnull(record.get('proposition')) else None)
+        contexts.append(context)
+        database.session.add(Contribution(
             title='NO TITLE',
             status='valid',
             contributor_id=admin.id,
             validator_id=admin.id,
             validated_at=datetime.datetime.utcnow(),
-            context=Context(
-                code=context['code'],
-                label_en=context['label_en'] if 'label_en' in context else None,
-                label_fr=context['label_fr'] if 'label_fr' in context else None,
-                label_ar=context['label_ar'] if 'label_ar' in context else None,
-                proposition_en=context['proposition_en'] if 'proposition_en' in context else None,
-                proposition_fr=context['proposition_fr'] if 'proposition_fr' in context else None,
-                proposition_ar=context['proposition_ar'] if 'proposition_ar' in context else None,
-                patterns=patterns,
-                responses=responses,
-                contexts=contexts,
-            )
-        )
-        database.session.add(contribution)
+            context=context,
+        ))
+    database.session.flush()
+
+    # LINK RELATED CONTEXTS
+    for context in contexts:
+        ids[context.code] = context.id
+    relations = []
+    for record in records:
+        for code in dict.fromkeys(record['to']):
+            if code in ids and code != record['code']:
+                relations.append({'main_context_id': ids[record['code']], 'related_context_id': ids[code]})
+    if relations:
+        database.session.execute(related_contexts.insert(), relations)
+    report['relations'] = len(relations)
+
+    if dry_run:
+        database.session.rollback()
+    else:
         database.session.commit()
 
+    seconds = time.monotonic() - start
+    rows = 2 * report['contexts'] + report['patterns'] + report['responses'] + report['relations']
+    report['seconds'] = seconds
+    report['rowsPerSecond'] = rows / seconds if seconds else None
+    return report
+
+
+def export_data(lang, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream the valid contexts in the input format of @save_data.
+    The contexts are read through a server-side cursor, @batch_size at a time,
+    and the patterns/responses/related codes of each batch are loaded with one IN query each.
+
+    :param lang: contexts' language
+    :param batch_size: number of contexts held in memory
+    :return: an iterator over the contexts in the format of
+             { 'code': '', 'tag': '', 'proposition': '', 'patterns': [], 'responses': [], 'to': [] }
+    """
+    if lang not in LANGUAGES:
+        raise ValueError(f'unsupported language: {lang}')
+    rows = database.session.query(
+        Context.id, Context.code, getattr(Context, f'label_{lang}'), getattr(Context, f'proposition_{lang}')
+    ).join(
+        Contribution, Context.contribution_id == Contribution.id
+    ).filter(
+        Contribution.status == 'valid'
+    ).order_by(Context.id).execution_options(stream_results=True).yield_per(batch_size)
+
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        ids = [row[0] for row in batch]
+        patterns = dict()
+        for context_id, label in database.session.query(Pattern.context_id, Pattern.label).filter(
+                Pattern.context_id.in_(ids), Pattern.language == lang
+        ).order_by(Pattern.id):
+            patterns.setdefault(context_id, []).append(label)
+        responses = dict()
+        for context_id, label in database.session.query(Response.context_id, Response.label).filter(
+                Response.context_id.in_(ids), Response.language == lang
+        ).order_by(Response.id):
+            responses.setdefault(context_id, []).append(label)
+        related = dict()
+        for context_id, code in database.session.query(related_contexts.c.main_context_id, Context.code).join(
+                Context, related_contexts.c.related_context_id == Context.id
+        ).filter(related_contexts.c.main_context_id.in_(ids)):
+            related.setdefault(context_id, []).append(code)
+
+        for id, code, tag, proposition in batch:
+            yield {
+                'code': code,
+                'tag': tag,
+                'proposition': proposition,
+                'patterns': patterns.get(id, []),
+                'responses': responses.get(id, []),
+                'to': related.get(id, []),
+            }
+
+
+def build_seed(collections):
+    """
+    Merge the per-language seed files into contributions.
+
+    :param collections: a list in the format of [{ 'lang': '', 'contexts': [] }], the contexts share the same order
+    :return: the contributions' data and a dictionary in the format of { code: [related codes] }
+    """
+    import pandas as pd
+
+    seed = []
+    relations = dict()
+    for index in range(len(collections[0]['contexts'])):
+        first = collections[0]['contexts'][index]
+        context = {
+            'code': first['code'],
+            'patterns': [],
+            'responses': [],
+        }
+        related = dict()
+        for collection in collections:
+            current_context = collection['contexts'][index]
+            context[f'label_{collection["lang"]}'] = current_context['tag']
+            context[f'proposition_{collection["lang"]}'] = current_context['proposition'] if not pd.isnull(
+                current_context['proposition']) else None
+            context['patterns'].extend((label, collection['lang']) for label in current_context['patterns'])
+            context['responses'].extend((label, collection['lang']) for label in current_context['responses'])
+            related.update(dict.fromkeys(current_context['to']))
+        seed.append({
+            'title': first['title'],
+            'description': first['description'],
+            'date': datetime.datetime.strptime(first['date'], '%Y-%m-%d'),
+            'context': context,
+        })
+        relations[first['code']] = [code for code in related if code != first['code']]
+    return seed, relations
+
 
 def initialize_database():
+    """
+    Seed an empty database with the roles, the administrator and the contributions of the data files,
+    in a single transaction with batched inserts.
+
+    :return: the number of seeded contributions
+    """
     # INITIALIZE ROLES
     if database.session.query(Role).count() == 0:
         roles = json.loads(open(f'{Path().absolute()}/server/database/data/roles.json').read())
-        for role in roles:
-            database.session.add(
-                Role(
-                    label=role['label'],
-                    permissions=Permission.dict_to_permissions(role['permissions'])
-                )
-            )
-            database.session.commit()
+        database.session.add_all([
+            Role(label=role['label'], permissions=Permission.dict_to_permissions(role['permissions']))
+            for role in roles
+        ])
+        database.session.flush()
 
     # INITIALIZE USERS
     if database.session.query(User).count() == 0:
@@ -80,80 +242,61 @@ def initialize_database():
             role_id=role.id
         )
         database.session.add(belkacem)
-        database.session.commit()
+        database.session.flush()
 
     # INITIALIZE CONTRIBUTIONS
+    seeded = 0
     if database.session.query(Context).count() == 0:
-        en = json.loads(open(f'{Path().absolute()}/server/model/data/database_en.json').read())
-        fr = json.loads(open(f'{Path().absolute()}/server/model/data/database_fr.json').read())
-        ar = json.loads(open(f'{Path().absolute()}/server/model/data/database_ar.json').read())
-
-        data = [
+        collections = [
             {
-                'lang': 'en',
-                'contexts': en
-            },
-            {
-                'lang': 'fr',
-                'contexts': fr
-            },
-            {
-                'lang': 'ar',
-                'contexts': ar
-            },
+                'lang': lang,
+                'contexts': json.loads(open(f'{Path().absolute()}/server/model/data/database_{lang}.json').read()),
+            }
+            for lang in LANGUAGES
         ]
+        seed, relations = build_seed(collections)
 
-        for index in reversed(range(len(en))):
-            contribution = dict()
-            context = dict()
-            patterns = []
-            responses = []
-            contexts = []
-
-            contribution['title'] = data[0]['contexts'][index]['title']
-            contribution['description'] = data[0]['contexts'][index]['description']
-            contribution['date'] = data[0]['contexts'][index]['date']
-
-            for collection in data:
-                current_context = collection['contexts'][index]
-                context['code'] = current_context['code']
-                context[f'label_{collection["lang"]}'] = current_context['tag']
-                context[f'proposition_{collection["lang"]}'] = current_context['proposition'] if not pd.isnull(
-                    current_context['proposition']) else None
-
-                for label in current_context['patterns']:
-                    patterns.append(Pattern(label=label, language=collection['lang']))
-                for label in current_context['responses']:
-                    responses.append(Response(label=label, language=collection['lang']))
-                for code in current_context['to']:
-                    c = Context.query.filter_by(code=code).first()
-                    if c is not None:
-                        if c not in contexts:
-                            contexts.append(c)
-
-            # GET ADMINISTRATOR
-            admin = database.session.query(User).filter_by(username='belkacem').first()
-            # SAVE CONTRIBUTION
-            contribution = Contribution(
-                title=contribution['title'],
-                description=contribution['description'],
+        # GET ADMINISTRATOR
+        admin = database.session.query(User).filter_by(username='belkacem').first()
+        # SAVE CONTRIBUTIONS
+        contexts = []
+        # REVERSED SO THAT THE CONTEXTS KEEP THE IDS OF THE ROW BY ROW SEEDING
+        for item in reversed(seed):
+            context = item['context']
+            contexts.append(Context(
+                code=context['code'],
+                label_en=context.get('label_en'),
+                label_fr=context.get('label_fr'),
+                label_ar=context.get('label_ar'),
+                proposition_en=context.get('proposition_en'),
+                proposition_fr=context.get('proposition_fr'),
+                proposition_ar=context.get('proposition_ar'),
+                patterns=[Pattern(label=label, language=lang) for label, lang in context['patterns']],
+                responses=[Response(label=label, language=lang) for label, lang in context['responses']],
+            ))
+            database.session.add(Contribution(
+                title=item['title'],
+                description=item['description'],
                 status='valid',
                 contributor_id=admin.id,
                 validator_id=admin.id,
-                created_at=datetime.datetime.strptime(contribution['date'], '%Y-%m-%d'),
-                validated_at=datetime.datetime.strptime(contribution['date'], '%Y-%m-%d'),
-                context=Context(
-                    code=context['code'],
-                    label_en=context['label_en'] if 'label_en' in context else None,
-                    label_fr=context['label_fr'] if 'label_fr' in context else None,
-                    label_ar=context['label_ar'] if 'label_ar' in context else None,
-                    proposition_en=context['proposition_en'] if 'proposition_en' in context else None,
-                    proposition_fr=context['proposition_fr'] if 'proposition_fr' in context else None,
-                    proposition_ar=context['proposition_ar'] if 'proposition_ar' in context else None,
-                    patterns=patterns,
-                    responses=responses,
-                    contexts=contexts,
-                )
-            )
-            database.session.add(contribution)
-            database.session.commit()
+                created_at=item['date'],
+                validated_at=item['date'],
+                context=contexts[-1],
+            ))
+        database.session.flush()
+
+        # LINK RELATED CONTEXTS
+        ids = {context.code: context.id for context in contexts}
+        rows = [
+            {'main_context_id': ids[code], 'related_context_id': ids[related_code]}
+            for code, related_codes in relations.items()
+            for related_code in related_codes
+            if related_code in ids
+        ]
+        if rows:
+            database.session.execute(related_contexts.insert(), rows)
+        seeded = len(seed)
+
+    database.session.commit()
+    return seeded
@@ -6,10 +6,15 @@ from sqlalchemy import *
 
 database = SQLAlchemy()
 
+# RELATED CONTEXTS MAY LINK BACK TO EACH OTHER, ONLY THIS NUMBER OF LEVELS IS SERIALIZED IN FULL
+CONTEXT_DEPTH = 1
+
 related_contexts = database.Table(
     'related_contexts',
     Column('main_context_id', Integer, ForeignKey('contexts.id', ondelete='CASCADE'), primary_key=True),
     Column('related_context_id', Integer, ForeignKey('contexts.id', ondelete='CASCADE'), primary_key=True),
+    # THE PRIMARY KEY ONLY SERVES LOOKUPS BY main_context_id
+    Index('ix_related_contexts_related_context_id', 'related_context_id'),
 )
 
 
@@ -104,6 +109,10 @@ class User(database.Model):
 
 class Contribution(database.Model):
     __tablename__ = 'contributions'
+    __table_args__ = (
+        Index('ix_contributions_status_id', 'status', 'id'),
+        Index('ix_contributions_created_at', 'created_at'),
+    )
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(Text)
@@ -157,7 +166,7 @@ class Context(database.Model):
     proposition_en = Column(String)
     proposition_fr = Column(String)
     proposition_ar = Column(String)
-    contribution_id = Column(Integer, ForeignKey('contributions.id'))
+    contribution_id = Column(Integer, ForeignKey('contributions.id'), index=True)
 
     contribution = database.relationship('Contribution', back_populates='context')
     patterns = database.relationship('Pattern', cascade='all')
@@ -171,7 +180,20 @@ class Context(database.Model):
         cascade="all, delete",
     )
 
-    def as_dict(self):
+    def as_dict(self, depth=CONTEXT_DEPTH):
+        """
+        :param depth: number of levels of related contexts serialized in full, the next level is referenced
+        :return: the context's dictionary
+        """
+        return dict(self.as_reference(), **{
+            "patterns": [pattern.as_dict() for pattern in self.patterns],
+            "responses": [response.as_dict() for response in self.responses],
+            "contexts": [
+                context.as_dict(depth - 1) if depth > 0 else context.as_reference() for context in self.contexts
+            ],
+        })
+
+    def as_reference(self):
         return dict({
             "id": self.id,
             "code": self.code,
@@ -181,9 +203,6 @@ class Context(database.Model):
             "propositionEn": self.proposition_en,
             "propositionFr": self.proposition_fr,
             "propositionAr": self.proposition_ar,
-            "patterns": [pattern.as_dict() for pattern in self.patterns],
-            "responses": [response.as_dict() for response in self.responses],
-            "contexts": [context.as_dict() for context in self.contexts],
         })
 
     @staticmethod
@@ -204,6 +223,10 @@ class Context(database.Model):
 
 class Pattern(database.Model):
     __tablename__ = 'patterns'
+    __table_args__ = (
+        Index('ix_patterns_context_id_language', 'context_id', 'language'),
+        Index('ix_patterns_language', 'language'),
+    )
     id = Column(Integer, primary_key=True)
     label = Column(String, nullable=False)
     language = Column(String, nullable=False)
@@ -226,6 +249,9 @@ class Pattern(database.Model):
 
 class Response(database.Model):
     __tablename__ = 'responses'
+    __table_args__ = (
+        Index('ix_responses_context_id_language', 'context_id', 'language'),
+    )
     id = Column(Integer, primary_key=True)
     label = Column(String, nullable=False)
     language = Column(String, nullable=False)
@@ -248,12 +274,20 @@ class Response(database.Model):
 
 class Model(database.Model):
     __tablename__ = 'models'
+    # THE PRIMARY KEY STARTS WITH path, IT DOES NOT SERVE LOOKUPS BY tag/state
+    __table_args__ = (
+        Index('ix_models_tag_state', 'tag', 'state'),
+    )
     path = Column(String, nullable=False, primary_key=True)
     state = Column(Enum('enabled', 'disabled', name="model_states"), nullable=False, default='disabled',
                    primary_key=True)
     tag = Column(Enum('dev', 'prod', 'none', name="model_tags"), nullable=False, default='none', primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=sqlalchemy.sql.functions.now(), nullable=False)
+    # { 'lang': { 'epochs': 0, 'bestValLoss': 0, 'trainingTime': 0 } }
+    metrics = Column(JSON)
+    # { 'lang': 'hash of the dataset the artifacts were trained on' }
+    datasets = Column(JSON)
 
     user = database.relationship('User', back_populates='models')
 
@@ -263,8 +297,20 @@ class Model(database.Model):
             'state': self.state,
             'tag': self.tag,
             'createdAt': self.created_at,
+            'metrics': self.metrics,
+            'datasets': self.datasets,
             'user': self.user.as_dict(),
         })
 
 
 User.models = database.relationship('Model')
+
+
+class CacheVersion(database.Model):
+    """
+    Version of a table, bumped in the transaction of every change to it (database.notifications.publish),
+    the ETags of the cached responses are built from it so that every process issues the same ones.
+    """
+    __tablename__ = 'cache_versions'
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,53 @@
+import json
+import os
+import uuid
+
+from sqlalchemy import text
+from .models import *
+
+CHANNEL = 'cache_invalidation'
+
+# TABLES CHANGED BY EACH EVENT, THEIR VERSIONS (CacheVersion) ARE BUMPED IN THE TRANSACTION OF THE CHANGE
+TABLES = {
+    'model': ['models'],
+    'promotion': ['models'],
+    'models_added': ['models'],
+    'contributions': ['contributions'],
+    'users': ['users'],
+    'roles': ['roles'],
+}
+
+# SHARED BY THE PROCESSES FORKED FROM THIS ONE, THE PID TELLS THEM APART
+NONCE = uuid.uuid4().hex
+
+
+def origin():
+    """
+    Identifies the notifications of the current process, it invalidates its own caches without waiting for them.
+    A worker forked by a preloading server gets its own origin and receives the notifications of its siblings.
+
+    :return: the origin of the current process
+    """
+    return f'{NONCE}-{os.getpid()}'
+
+
+def publish(event, **arguments):
+    """
+    Bump the versions of the changed tables and notify the other processes of the change and of the new versions
+    through Postgres NOTIFY, both in the current transaction so that they only take effect once it is committed.
+
+    :param event: the change, a key of listener.HANDLERS
+    :param arguments: the arguments of the event's handler, JSON serializable
+    :return: None
+    """
+    versions = dict()
+    for table in TABLES.get(event, []):
+        versions[table] = database.session.execute(text(
+            'INSERT INTO cache_versions (name, version) VALUES (:name, 1) '
+            'ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1 RETURNING version'
+        ), {'name': table}).scalar()
+    # Flask-SQLAlchemy 2's SignallingSession.get_bind() DOES NOT TAKE THE bind ARGUMENT OF THE scoped_session PROXY
+    if database.engine.dialect.name != 'postgresql':
+        return
+    payload = json.dumps({'origin': origin(), 'event': event, 'arguments': arguments, 'versions': versions})
+    database.session.execute(text('SELECT pg_notify(:channel, :payload)'), {'channel': CHANNEL, 'payload': payload})
@@ -0,0 +1,67 @@
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+PAGE_SIZE = 50
+PAGE_SIZE_LIMIT = 200
+
+
+def encode_cursor(values):
+    """
+    :param values: the ordering columns' values of the last row of a page
+    :return: an opaque cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: a cursor returned by @encode_cursor
+    :return: the ordering columns' values, raises ValueError if the cursor is invalid
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('invalid cursor')
+    return values
+
+
+def paginate(query, columns, limit, cursor=None):
+    """
+    Keyset pagination: the rows following the cursor in the order of @columns.
+
+    :param query: the listing's query
+    :param columns: the ordering columns, they must identify a row
+    :param limit: the page size, None returns every row
+    :param cursor: the cursor of the previous page
+    :return: the page's rows and the next page's cursor (None for the last page)
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError('invalid cursor')
+        query = query.filter(tuple_(*columns) > tuple_(*values))
+    query = query.order_by(*columns)
+    if limit is None:
+        return query.all(), None
+
+    limit = max(1, min(limit, PAGE_SIZE_LIMIT))
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+
+def select_fields(items, fields):
+    """
+    :param items: serialized rows
+    :param fields: the requested fields, None keeps every field
+    :return: the rows restricted to the requested fields
+    """
+    if fields is None:
+        return items
+    return [{key: value for key, value in item.items() if key in fields} if item else item for item in items]
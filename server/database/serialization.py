@@ -0,0 +1,217 @@
+import threading
+
+from sqlalchemy.orm import selectinload
+from .models import *
+
+MAX_DEPTH = 5
+
+CONTRIBUTION_FIELDS = [
+    'id', 'title', 'description', 'status', 'context', 'createdAt', 'validatedAt', 'contributor', 'validator',
+]
+
+
+class ContextGraph:
+    """
+    In-memory adjacency list of the related_contexts table,
+    loaded once and dropped when contributions change.
+    """
+
+    def __init__(self):
+        self._related = None
+        self._lock = threading.Lock()
+
+    def adjacency(self):
+        """
+        :return: a dictionary in the format of { main_context_id: [related_context_id] }
+        """
+        related = self._related
+        if related is None:
+            with self._lock:
+                related = self._related
+                if related is None:
+                    related = dict()
+                    for main_context_id, related_context_id in database.session.query(
+                            related_contexts.c.main_context_id, related_contexts.c.related_context_id
+                    ).all():
+                        related.setdefault(main_context_id, []).append(related_context_id)
+                    self._related = related
+        return related
+
+    def invalidate(self):
+        with self._lock:
+            self._related = None
+
+
+context_graph = ContextGraph()
+
+
+class Serializer:
+    """
+    Serializes listings in a bounded number of queries,
+    a constant plus one per 500 contexts for each selectin-loaded relationship (patterns, responses):
+    the object graph is loaded up front with selectin loading,
+    then every user, role and context is serialized once and reused.
+
+    Related contexts are serialized in full up to @depth levels and referenced (id, code, labels) beyond,
+    so cycles in related_contexts are harmless and the payload stays linear in the number of contexts.
+    """
+
+    def __init__(self, depth=CONTEXT_DEPTH):
+        self.depth = max(0, min(depth, MAX_DEPTH))
+        self.contexts = dict()
+        self.loaded_users = dict()
+        self.serialized_contexts = dict()
+        self.serialized_users = dict()
+        self.serialized_roles = dict()
+
+    def _query_contexts(self, condition):
+        contexts = Context.query.options(
+            selectinload(Context.patterns),
+            selectinload(Context.responses),
+        ).filter(condition).all()
+        for context in contexts:
+            self.contexts[context.id] = context
+        return contexts
+
+    def load_contexts(self, contributions):
+        """
+        Load the contributions' contexts and the related contexts reachable within the serialized depth.
+
+        :param contributions: a list of Contribution objects
+        :return: a dictionary in the format of { contribution_id: context_id }
+        """
+        roots = self._query_contexts(Context.contribution_id.in_([c.id for c in contributions]))
+        adjacency = context_graph.adjacency()
+        needed = {context.id for context in roots}
+        frontier = set(needed)
+        for _ in range(self.depth + 1):
+            frontier = {related_id for context_id in frontier for related_id in adjacency.get(context_id, [])}
+            frontier -= needed
+            needed |= frontier
+        missing = needed - set(self.contexts)
+        if missing:
+            self._query_contexts(Context.id.in_(missing))
+        return {context.contribution_id: context.id for context in roots}
+
+    def load_users(self, ids):
+        ids = set(ids) - set(self.loaded_users) - {None}
+        if not ids:
+            return
+        users = User.query.options(
+            selectinload(User.role).selectinload(Role.permissions)
+        ).filter(User.id.in_(ids)).all()
+        for user in users:
+            self.loaded_users[user.id] = user
+
+    def context(self, context_id, depth=None):
+        """
+        :param context_id: Context's id
+        :param depth: number of levels of related contexts serialized in full
+        :return: the same dictionary as Context.as_dict, None if there is no context
+        """
+        if context_id is None:
+            return None
+        depth = self.depth if depth is None else depth
+        key = (context_id, depth)
+        if key not in self.serialized_contexts:
+            context = self.contexts[context_id]
+            # A CONTEXT DELETED BY ANOTHER PROCESS MAY STILL BE IN THE ADJACENCY LIST
+            related = [r for r in context_graph.adjacency().get(context_id, []) if r in self.contexts]
+            self.serialized_contexts[key] = dict(context.as_reference(), **{
+                "patterns": [pattern.as_dict() for pattern in context.patterns],
+                "responses": [response.as_dict() for response in context.responses],
+                "contexts": [
+                    self.context(related_id, depth - 1) if depth > 0 else self.reference(related_id)
+                    for related_id in related
+                ],
+            })
+        return self.serialized_contexts[key]
+
+    def reference(self, context_id):
+        key = (context_id, None)
+        if key not in self.serialized_contexts:
+            self.serialized_contexts[key] = self.contexts[context_id].as_reference()
+        return self.serialized_contexts[key]
+
+    def role(self, role):
+        if role.id not in self.serialized_roles:
+            self.serialized_roles[role.id] = role.as_dict()
+        return self.serialized_roles[role.id]
+
+    def user(self, user_id):
+        """
+        :param user_id: User's id
+        :return: the same dictionary as User.as_dict
+        """
+        if user_id is None:
+            return None
+        if user_id not in self.serialized_users:
+            user = self.loaded_users[user_id]
+            self.serialized_users[user_id] = dict({
+                'id': user.id,
+                'username': user.username,
+                'firstName': user.first_name,
+                'lastName': user.last_name,
+                'birthdate': user.birth_date,
+                'gender': user.gender,
+                'status': user.status,
+                'role': self.role(user.role),
+            })
+        return self.serialized_users[user_id]
+
+    def contributions(self, contributions, fields=None):
+        """
+        :param contributions: a list of Contribution objects
+        :param fields: the requested fields, None serializes every field
+        :return: the same dictionaries as Contribution.as_dict, restricted to the requested fields
+        """
+        fields = fields or CONTRIBUTION_FIELDS
+        # THE CONTEXTS/USERS ARE NOT LOADED WHEN THEY ARE NOT REQUESTED
+        context_ids = self.load_contexts(contributions) if 'context' in fields else dict()
+        if 'contributor' in fields or 'validator' in fields:
+            self.load_users([c.contributor_id for c in contributions] + [c.validator_id for c in contributions])
+        getters = {
+            'id': lambda contribution: contribution.id,
+            'title': lambda contribution: contribution.title,
+            'description': lambda contribution: contribution.description,
+            'status': lambda contribution: contribution.status,
+            'context': lambda contribution: self.context(context_ids.get(contribution.id)),
+            'createdAt': lambda contribution: contribution.created_at,
+            'validatedAt': lambda contribution: contribution.validated_at,
+            'contributor': lambda contribution: self.user(contribution.contributor_id),
+            'validator': lambda contribution: self.user(contribution.validator_id),
+        }
+        fields = [field for field in CONTRIBUTION_FIELDS if field in fields]
+        return [{field: getters[field](contribution) for field in fields} for contribution in contributions]
+
+    def users(self, users):
+        """
+        :param users: a list of User objects
+        :return: the same dictionaries as User.as_dict
+        """
+        self.load_users([user.id for user in users])
+        return [self.user(user.id) for user in users]
+
+    def contribution_contexts(self, contributions):
+        """
+        :param contributions: a list of Contribution objects
+        :return: the same dictionaries as Context.as_dict of each contribution's context
+        """
+        context_ids = self.load_contexts(contributions)
+        return [self.context(context_ids.get(contribution.id)) for contribution in contributions]
+
+    def models(self, models):
+        """
+        :param models: a list of Model objects
+        :return: the same dictionaries as Model.as_dict
+        """
+        self.load_users([model.user_id for model in models])
+        return [dict({
+            'path': model.path,
+            'state': model.state,
+            'tag': model.tag,
+            'createdAt': model.created_at,
+            'metrics': model.metrics,
+            'datasets': model.datasets,
+            'user': self.user(model.user_id),
+        }) for model in models]
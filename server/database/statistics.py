@@ -0,0 +1,104 @@
+import threading
+
+from .models import *
+
+
+class StatisticsCache:
+    """
+    Snapshot of the dashboard's statistics,
+    each entry is computed once and dropped when the tables it depends on change.
+    """
+
+    def __init__(self):
+        self._entries = dict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key, tables, compute):
+        """
+        :param key: the statistic's name
+        :param tables: names of the tables the statistic depends on
+        :param compute: function computing the statistic
+        :return: the cached statistic
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            generation = self._generation
+            entry = (set(tables), compute())
+            with self._lock:
+                # A STATISTIC COMPUTED WHILE ITS TABLES WERE CHANGING IS NOT KEPT
+                if generation == self._generation:
+                    self._entries[key] = entry
+        return entry[1]
+
+    def invalidate(self, *tables):
+        """
+        :param tables: names of the changed tables, none drops every statistic
+        :return: None
+        """
+        with self._lock:
+            self._generation += 1
+            for key, entry in list(self._entries.items()):
+                if not tables or entry[0].intersection(tables):
+                    del self._entries[key]
+
+
+statistics_cache = StatisticsCache()
+
+
+def contributions_per_month(year):
+    """
+    :param year: the contributions' year
+    :return: the number of contributions created in each month of the year
+    """
+    month = extract('month', Contribution.created_at)
+    # A RANGE ON created_at (RATHER THAN EXTRACT(YEAR)) CAN USE ITS INDEX
+    rows = database.session.query(month, func.count(Contribution.id)).filter(
+        Contribution.created_at >= datetime.datetime(year, 1, 1),
+        Contribution.created_at < datetime.datetime(year + 1, 1, 1),
+    ).group_by(month).all()
+    counts = [0] * 12
+    for row in rows:
+        counts[int(row[0]) - 1] = row[1]
+    return counts
+
+
+def users_per_role():
+    """
+    :return: a list in the format of [{ 'role': '', 'users': 0 }]
+    """
+    rows = database.session.query(Role.label, func.count(User.id)).outerjoin(
+        User, User.role_id == Role.id
+    ).filter(Role.label != 'guest').group_by(Role.id, Role.label).order_by(Role.id).all()
+    return [{'role': row[0], 'users': row[1]} for row in rows]
+
+
+def contributions_per_status():
+    """
+    :return: a dictionary in the format of { 'status': 0 }
+    """
+    rows = database.session.query(Contribution.status, func.count(Contribution.id)).group_by(
+        Contribution.status
+    ).all()
+    return {row[0]: row[1] for row in rows}
+
+
+def contributions_per_contributor():
+    """
+    :return: a list in the format of [{ 'id': 0, 'contributor': '', 'contributions': 0 }]
+    """
+    count = func.count(Contribution.id)
+    rows = database.session.query(User.id, User.username, count).join(
+        Contribution, Contribution.contributor_id == User.id
+    ).group_by(User.id, User.username).order_by(count.desc()).all()
+    return [{'id': row[0], 'contributor': row[1], 'contributions': row[2]} for row in rows]
+
+
+def contributions_per_language():
+    """
+    :return: a dictionary in the format of { 'lang': number of contributions having patterns in this language }
+    """
+    rows = database.session.query(Pattern.language, func.count(distinct(Context.contribution_id))).join(
+        Context, Pattern.context_id == Context.id
+    ).group_by(Pattern.language).all()
+    return {row[0]: row[1] for row in rows}
@@ -0,0 +1,28 @@
+"""
+Pre-forking chat server, run from the repository's root:
+    gunicorn -c server/gunicorn.conf.py
+
+The enabled models are loaded once by the master process, memory-mapped, before the workers are forked.
+"""
+import os
+
+wsgi_app = 'chat:create_chat_app()'
+pythonpath = 'server'
+bind = os.environ.get('CHAT_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('CHAT_WORKERS', 4))
+# THE APPLICATION (AND THE PRELOADED MODELS) IS LOADED BEFORE FORKING
+preload_app = True
+# CHAT_PRELOAD=0 LOADS THE MODELS IN EACH WORKER ON ITS FIRST REQUEST (FOR COMPARISON)
+preload_models = os.environ.get('CHAT_PRELOAD', '1') == '1'
+
+
+def when_ready(server):
+    from model.registry import registry
+    from chat import preload_models as preload
+
+    # TENSORFLOW MUST NOT BE INITIALIZED BEFORE FORKING, THE WORKERS SERVE THE NUMPY ARTIFACTS
+    registry.backend = 'numpy'
+    registry.mmap = True
+    if preload_models:
+        with server.app.wsgi().app_context():
+            server.log.info('preloaded %s', preload())
@@ -0,0 +1,99 @@
+import threading
+
+from flask import current_app
+from model.registry import registry
+from server.database.models import database as model_database
+from model.contexts import context_tables
+from database.serialization import context_graph
+from database.statistics import statistics_cache
+from caching import response_cache
+from database.initialization import LANGUAGES
+
+
+def model_changed(path):
+    """
+    Drop everything cached for a model whose state/tag changed or that was deleted.
+
+    :param path: model's folder name (Model.path)
+    :return: None
+    """
+    registry.invalidate(path)
+    context_tables.invalidate(path)
+    response_cache.discard('models')
+
+
+def model_promoted(tag, path, replaced):
+    """
+    Load and warm a model that now serves @tag in the background, then swap the serving pointer to it
+    and release the models it replaced, the chat keeps answering with the previous model meanwhile.
+
+    :param tag: 'dev' or 'prod'
+    :param path: the promoted model's folder name (Model.path)
+    :param replaced: folder names of the models disabled by the promotion
+    :return: the background thread
+    """
+    response_cache.discard('models')
+    # UNTIL THE SWAP, THE PREVIOUS MODEL KEEPS SERVING EVEN IF ITS POINTER EXPIRES
+    registry.begin_promotion(tag, path)
+    app = current_app._get_current_object()
+
+    def promote():
+        # THE CONTEXT TABLES ARE READ FROM THE DATABASE, WITH THE SESSION OF THE MODEL PACKAGE
+        with app.app_context():
+            try:
+                for lang in LANGUAGES:
+                    try:
+                        context_tables.get(path, lang, registry.get(path, lang).classes)
+                    except Exception as exception:
+                        print(exception)
+                previous = registry.promote(tag, path, LANGUAGES)
+                for released in set(replaced + [previous]) - {None, path}:
+                    model_changed(released)
+            finally:
+                registry.end_promotion(tag, path)
+                model_database.session.remove()
+
+    thread = threading.Thread(target=promote, daemon=True)
+    thread.start()
+    return thread
+
+
+def models_added():
+    """
+    Drop everything cached from the models listing, a training job saved a new model.
+
+    :return: None
+    """
+    response_cache.discard('models')
+
+
+def contributions_changed():
+    """
+    Drop everything cached from the contributions/contexts tables.
+
+    :return: None
+    """
+    context_tables.invalidate()
+    context_graph.invalidate()
+    statistics_cache.invalidate('contributions')
+    response_cache.discard('contributions')
+
+
+def users_changed():
+    """
+    Drop everything cached from the users table.
+
+    :return: None
+    """
+    statistics_cache.invalidate('users')
+    response_cache.discard('users')
+
+
+def roles_changed():
+    """
+    Drop everything cached from the roles/permissions tables.
+
+    :return: None
+    """
+    statistics_cache.invalidate('roles')
+    response_cache.discard('roles')
@@ -0,0 +1,132 @@
+import json
+import os
+import select
+import threading
+import time
+
+from database.models import database
+from database.notifications import CHANNEL, origin
+from caching import response_cache
+from invalidation import model_changed, model_promoted, models_added, contributions_changed, users_changed, \
+    roles_changed
+
+# EVENT -> INVALIDATION FUNCTION, CALLED WITH THE EVENT'S ARGUMENTS
+HANDLERS = {
+    'model': model_changed,
+    'promotion': model_promoted,
+    'models_added': models_added,
+    'contributions': contributions_changed,
+    'users': users_changed,
+    'roles': roles_changed,
+}
+
+
+def resync():
+    """
+    Notifications sent while the listener was disconnected are lost, drop everything they could have invalidated.
+    The serving pointers of the registry expire on their own.
+
+    :return: None
+    """
+    models_added()
+    contributions_changed()
+    users_changed()
+    roles_changed()
+
+
+class Listener:
+    """
+    Thread of a serving process receiving the notifications of the other processes (Postgres LISTEN)
+    and invalidating the affected cache entries.
+    """
+
+    POLL_TIMEOUT = 5.
+    RECONNECT_DELAY = 1.
+
+    def __init__(self):
+        self.pid = None
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def ensure_started(self, app):
+        """
+        Start the thread once per process, a forked worker starts its own.
+
+        :param app: the Flask application
+        :return: None
+        """
+        if self.pid == os.getpid():
+            return
+        with self._lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                threading.Thread(target=self._run, args=(app,), daemon=True).start()
+
+    def _run(self, app):
+        with app.app_context():
+            connected_before = False
+            while True:
+                try:
+                    connection = database.engine.raw_connection()
+                except Exception as exception:
+                    print(exception)
+                    time.sleep(self.RECONNECT_DELAY)
+                    continue
+                try:
+                    connection.connection.autocommit = True
+                    connection.cursor().execute(f'LISTEN {CHANNEL}')
+                    # THE VERSIONS MAY HAVE CHANGED BEFORE THE LISTENER WAS CONNECTED
+                    response_cache.forget_versions()
+                    if connected_before:
+                        resync()
+                    connected_before = True
+                    self._listen(connection.connection)
+                except Exception as exception:
+                    print(exception)
+                    time.sleep(self.RECONNECT_DELAY)
+                finally:
+                    connection.invalidate()
+
+    def _listen(self, connection):
+        while True:
+            if select.select([connection], [], [], self.POLL_TIMEOUT) == ([], [], []):
+                continue
+            connection.poll()
+            while connection.notifies:
+                self.dispatch(connection.notifies.pop(0).payload)
+
+    def dispatch(self, payload):
+        """
+        :param payload: a notification sent by database.notifications.publish
+        :return: None
+        """
+        message = json.loads(payload)
+        if message['origin'] == origin():
+            return
+        handler = HANDLERS.get(message['event'])
+        if handler is None:
+            print(f'unknown notification: {message["event"]}')
+            return
+        try:
+            handler(**message['arguments'])
+            # THE NEW VERSIONS ARE KNOWN, THE NEXT REQUEST DOES NOT READ THEM AGAIN
+            response_cache.advance(message.get('versions', dict()))
+        except Exception as exception:
+            print(exception)
+        self.received += 1
+
+
+listener = Listener()
+
+
+def init_app(app):
+    """
+    Listen to the notifications of the other processes from the first request of each process,
+    the master process of a pre-forking server does not listen.
+
+    :param app: the Flask application
+    :return: None
+    """
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgres'):
+        return
+    app.before_request(lambda: listener.ensure_started(app))
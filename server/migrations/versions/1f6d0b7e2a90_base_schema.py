@@ -0,0 +1,126 @@
+"""base schema
+
+Revision ID: 1f6d0b7e2a90
+Revises: 
+Create Date: 2026-10-18 10:05:12.614370
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f6d0b7e2a90'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A DATABASE CREATED BY create_all BEFORE THE MIGRATIONS EXISTED ALREADY HAS THE BASE SCHEMA
+    if 'models' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'roles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('label', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('label'),
+    )
+    op.create_table(
+        'permissions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('label', sa.String(), nullable=True),
+        sa.Column('can_create_all', sa.Boolean(), nullable=True),
+        sa.Column('can_create', sa.Boolean(), nullable=True),
+        sa.Column('can_read_all', sa.Boolean(), nullable=True),
+        sa.Column('can_read', sa.Boolean(), nullable=True),
+        sa.Column('can_update_all', sa.Boolean(), nullable=True),
+        sa.Column('can_update', sa.Boolean(), nullable=True),
+        sa.Column('can_delete_all', sa.Boolean(), nullable=True),
+        sa.Column('can_delete', sa.Boolean(), nullable=True),
+        sa.Column('role_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=255), nullable=True),
+        sa.Column('password', sa.String(length=255), nullable=True),
+        sa.Column('first_name', sa.String(), nullable=True),
+        sa.Column('last_name', sa.String(), nullable=True),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.Column('gender', sa.Enum('f', 'm', name='gender'), nullable=True),
+        sa.Column('status', sa.Enum('valid', 'pending', 'invalid', name='user_status'), nullable=True),
+        sa.Column('role_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+    )
+    op.create_table(
+        'contributions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('pending', 'valid', 'invalid', name='contribution_status'), nullable=False),
+        sa.Column('contributor_id', sa.Integer(), nullable=False),
+        sa.Column('validator_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+        sa.Column('validated_at', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['contributor_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['validator_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'contexts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(), nullable=True),
+        sa.Column('label_en', sa.String(), nullable=True),
+        sa.Column('label_fr', sa.String(), nullable=True),
+        sa.Column('label_ar', sa.String(), nullable=True),
+        sa.Column('proposition_en', sa.String(), nullable=True),
+        sa.Column('proposition_fr', sa.String(), nullable=True),
+        sa.Column('proposition_ar', sa.String(), nullable=True),
+        sa.Column('contribution_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['contribution_id'], ['contributions.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code'),
+    )
+    op.create_table(
+        'related_contexts',
+        sa.Column('main_context_id', sa.Integer(), nullable=False),
+        sa.Column('related_context_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['main_context_id'], ['contexts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_context_id'], ['contexts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('main_context_id', 'related_context_id'),
+    )
+    for table in ['patterns', 'responses']:
+        op.create_table(
+            table,
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('label', sa.String(), nullable=False),
+            sa.Column('language', sa.String(), nullable=False),
+            sa.Column('context_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['context_id'], ['contexts.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    op.create_table(
+        'models',
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('state', sa.Enum('enabled', 'disabled', name='model_states'), nullable=False),
+        sa.Column('tag', sa.Enum('dev', 'prod', 'none', name='model_tags'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('path', 'state', 'tag'),
+    )
+
+
+def downgrade():
+    for table in ['models', 'responses', 'patterns', 'related_contexts', 'contexts', 'contributions', 'users',
+                  'permissions', 'roles']:
+        op.drop_table(table)
+    for name in ['model_tags', 'model_states', 'contribution_status', 'user_status', 'gender']:
+        op.execute(f'DROP TYPE IF EXISTS {name}')
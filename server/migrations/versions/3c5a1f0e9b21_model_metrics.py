@@ -0,0 +1,24 @@
+"""models.metrics
+
+Revision ID: 3c5a1f0e9b21
+Revises: 1f6d0b7e2a90
+Create Date: 2026-10-18 10:12:04.381245
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5a1f0e9b21'
+down_revision = '1f6d0b7e2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A DATABASE CREATED BY 'flask seed' AFTER THE COLUMN WAS ADDED ALREADY HAS IT
+    op.execute('ALTER TABLE models ADD COLUMN IF NOT EXISTS metrics JSON')
+
+
+def downgrade():
+    op.drop_column('models', 'metrics')
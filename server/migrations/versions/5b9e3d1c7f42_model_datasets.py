@@ -0,0 +1,24 @@
+"""models.datasets
+
+Revision ID: 5b9e3d1c7f42
+Revises: 3c5a1f0e9b21
+Create Date: 2026-10-18 10:18:26.517930
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e3d1c7f42'
+down_revision = '3c5a1f0e9b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A DATABASE CREATED BY 'flask seed' AFTER THE COLUMN WAS ADDED ALREADY HAS IT
+    op.execute('ALTER TABLE models ADD COLUMN IF NOT EXISTS datasets JSON')
+
+
+def downgrade():
+    op.drop_column('models', 'datasets')
@@ -0,0 +1,43 @@
+"""indexes of the filtered columns
+
+Revision ID: 8d2e47b6a0c4
+Revises: 5b9e3d1c7f42
+Create Date: 2026-10-18 10:31:47.902113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e47b6a0c4'
+down_revision = '5b9e3d1c7f42'
+branch_labels = None
+depends_on = None
+
+# name, table, columns
+INDEXES = [
+    # SELECTIN LOADING OF A CONTEXT'S PATTERNS/RESPONSES, CORPUS OF A LANGUAGE
+    ('ix_patterns_context_id_language', 'patterns', ['context_id', 'language']),
+    ('ix_patterns_language', 'patterns', ['language']),
+    ('ix_responses_context_id_language', 'responses', ['context_id', 'language']),
+    # CONTRIBUTIONS OF A STATUS PAGINATED BY id, CONTRIBUTIONS PER MONTH
+    ('ix_contributions_status_id', 'contributions', ['status', 'id']),
+    ('ix_contributions_created_at', 'contributions', ['created_at']),
+    # CONTEXTS OF A PAGE OF CONTRIBUTIONS
+    ('ix_contexts_contribution_id', 'contexts', ['contribution_id']),
+    # SERVED MODEL OF A TAG
+    ('ix_models_tag_state', 'models', ['tag', 'state']),
+    # CONTEXTS LINKING TO A CONTEXT (CASCADES)
+    ('ix_related_contexts_related_context_id', 'related_contexts', ['related_context_id']),
+]
+
+
+def upgrade():
+    # DATABASES CREATED BY 'flask seed' AFTER THE INDEXES WERE ADDED TO THE MODELS ALREADY HAVE THEM
+    for name, table, columns in INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
@@ -0,0 +1,24 @@
+"""cache_versions
+
+Revision ID: a7c4e1f9d253
+Revises: 8d2e47b6a0c4
+Create Date: 2026-10-18 16:42:09.205718
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e1f9d253'
+down_revision = '8d2e47b6a0c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A DATABASE CREATED BY 'flask seed' AFTER THE TABLE WAS ADDED ALREADY HAS IT
+    op.execute('CREATE TABLE IF NOT EXISTS cache_versions (name VARCHAR PRIMARY KEY, version INTEGER NOT NULL)')
+
+
+def downgrade():
+    op.drop_table('cache_versions')
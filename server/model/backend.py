@@ -0,0 +1,109 @@
+import zipfile
+
+import numpy as np
+
+
+def export_weights(model, path):
+    """
+    Save the Dense layers of a trained Keras model to a NumPy artifact
+    so that it can be served without TensorFlow.
+    Dropout layers are skipped, they are not applied at inference.
+
+    :param model: trained Keras model
+    :param path: destination of the .npz file
+    :return: None
+    """
+    arrays = dict()
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+        kernel, bias = weights
+        arrays[f'kernel_{len(activations)}'] = kernel.astype(np.float32)
+        arrays[f'bias_{len(activations)}'] = bias.astype(np.float32)
+        activations.append(layer.get_config().get('activation', 'linear'))
+    np.savez(path, activations=np.array(activations), **arrays)
+
+
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+def map_npz(path):
+    """
+    Memory-map the arrays of an uncompressed .npz file (np.savez) instead of reading them,
+    processes mapping the same file share its pages through the page cache.
+
+    :param path: a .npz file
+    :return: a dictionary in the format of { name: read-only array }
+    """
+    arrays = dict()
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f'{info.filename} is compressed, it cannot be memory-mapped')
+            # THE MEMBER'S DATA FOLLOWS ITS LOCAL HEADER (30 BYTES, THE NAME AND THE EXTRA FIELD)
+            file.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2')
+            file.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            name = info.filename[:-len('.npy')]
+            if dtype.hasobject:
+                raise ValueError(f'{name} holds Python objects, it cannot be memory-mapped')
+            arrays[name] = np.memmap(file.name, dtype=dtype, mode='r', offset=file.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': _relu,
+    'softmax': _softmax,
+}
+
+
+class NumpyModel:
+    """
+    Pure NumPy implementation of the forward pass of the Dense network built by train_model.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    @staticmethod
+    def load(path, mmap=False):
+        """
+        :param path: a .npz file written by @export_weights
+        :param mmap: memory-map the weights (@map_npz) instead of reading them
+        :return: the loaded model
+        """
+        with np.load(path) as artifact:
+            arrays = map_npz(path) if mmap else artifact
+            layers = []
+            for index, activation in enumerate(artifact['activations']):
+                if str(activation) not in ACTIVATIONS:
+                    raise ValueError(f'unsupported activation: {activation}')
+                layers.append((arrays[f'kernel_{index}'], arrays[f'bias_{index}'], ACTIVATIONS[str(activation)]))
+        return NumpyModel(layers)
+
+    def predict(self, inputs):
+        """
+        :param inputs: a (n, len(words)) matrix
+        :return: a (n, len(classes)) matrix of probabilities
+        """
+        x = np.asarray(inputs, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+        return x
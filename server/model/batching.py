@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+settings = {
+    'enabled': True,
+    'window': 0.005,
+    'max_batch_size': 32,
+}
+
+
+def configure(enabled=None, window=None, max_batch_size=None):
+    """
+    Update the micro-batching settings, used by the batchers created afterwards.
+
+    :param enabled: whether concurrent predictions are grouped in a single forward pass
+    :param window: maximum time (in seconds) a prediction waits for other ones
+    :param max_batch_size: maximum number of predictions per forward pass
+    :return: None
+    """
+    if enabled is not None:
+        settings['enabled'] = enabled
+    if window is not None:
+        settings['window'] = window
+    if max_batch_size is not None:
+        settings['max_batch_size'] = max_batch_size
+
+
+class _Request:
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects the predictions submitted concurrently for one model,
+    runs them in a single forward pass and hands each caller its own rows.
+    """
+
+    _STOP = object()
+
+    def __init__(self, predict, window, max_batch_size):
+        self.predict = predict
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, inputs):
+        """
+        :param inputs: a (n, len(words)) matrix
+        :return: the model's output for these inputs
+        """
+        request = _Request(inputs)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                self._queue.put(request)
+        # A REQUEST HOLDING A RELEASED BUNDLE IS ANSWERED WITHOUT BATCHING
+        if closed:
+            return self.predict(inputs)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self):
+        """
+        Stop the worker thread once the pending predictions are answered,
+        the predictions submitted afterwards run in the caller's thread.
+
+        :return: None
+        """
+        with self._lock:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(self._STOP)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is self._STOP:
+            return None
+        batch = [first]
+        size = len(first.inputs)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is self._STOP:
+                self._queue.put(request)
+                break
+            batch.append(request)
+            size += len(request.inputs)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                outputs = self.predict(np.concatenate([request.inputs for request in batch]))
+                offset = 0
+                for request in batch:
+                    request.result = outputs[offset:offset + len(request.inputs)]
+                    offset += len(request.inputs)
+            except Exception as exception:
+                for request in batch:
+                    request.error = exception
+            self.batches += 1
+            self.requests += len(batch)
+            for request in batch:
+                request.done.set()
@@ -0,0 +1,133 @@
+import threading
+
+from sqlalchemy.orm import selectinload
+from server.database.models import *
+from .featurizer import normalize
+
+
+def get_label(lang, context):
+    """
+    :param lang: label's language
+    :param context: Context object
+    :return: context's label based on the specified language
+    """
+    return getattr(context, f'label_{lang}', None)
+
+
+def get_proposition(lang, context):
+    """
+    :param lang: proposition's language
+    :param context: Context object
+    :return: context's proposition based on the specified language
+    """
+    return getattr(context, f'proposition_{lang}', None)
+
+
+class ContextTables:
+    """
+    Per (model path, language) lookup tables mapping a predicted class to
+    its responses and the propositions of its next contexts,
+    so a chat message never loads contexts from the database.
+
+    Along each table, an exact-match index maps the normalized patterns of the validated contexts
+    (the training data) and the propositions to their class, a message found in it skips the classifier.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._building = {}
+        self.generation = 0
+
+    def get(self, path, lang, classes):
+        """
+        :param path: model's folder name (Model.path)
+        :param lang: the language chosen by the user
+        :param classes: list of classes used while training the model
+        :return: a dictionary in the format of { 'class': (responses, propositions) }
+        """
+        return self._get(path, lang, classes)[0]
+
+    def exact(self, path, lang, classes):
+        """
+        :param path: model's folder name (Model.path)
+        :param lang: the language chosen by the user
+        :param classes: list of classes used while training the model
+        :return: a dictionary in the format of { 'normalized pattern or proposition': 'class' }
+        """
+        return self._get(path, lang, classes)[1]
+
+    def _get(self, path, lang, classes):
+        key = (path, lang)
+        tables = self._tables.get(key)
+        if tables is not None:
+            return tables
+
+        # ONLY ONE THREAD BUILDS A GIVEN TABLE, THE OTHERS WAIT FOR IT, THE OTHER TABLES STAY AVAILABLE
+        with self._lock:
+            tables = self._tables.get(key)
+            if tables is not None:
+                return tables
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            tables = self._tables.get(key)
+            if tables is None:
+                generation = self.generation
+                tables = self._build(lang, classes)
+                with self._lock:
+                    # A TABLE INVALIDATED DURING ITS BUILD MAY BE STALE, IT ONLY ANSWERS THIS REQUEST
+                    if generation == self.generation:
+                        self._tables[key] = tables
+                    self._building.pop(key, None)
+        return tables
+
+    @staticmethod
+    def _build(lang, classes):
+        known = set(classes)
+        table = dict()
+        index = dict()
+        ambiguous = set()
+        contexts = Context.query.options(
+            selectinload(Context.responses),
+            selectinload(Context.contexts),
+            selectinload(Context.patterns),
+            selectinload(Context.contribution),
+        ).all()
+        for context in contexts:
+            label = get_label(lang, context)
+            if label in known:
+                table[label] = (
+                    [response.label for response in context.responses if response.language == lang],
+                    [get_proposition(lang, next_context) for next_context in context.contexts],
+                )
+                texts = [get_proposition(lang, context)]
+                if context.contribution is not None and context.contribution.status == 'valid':
+                    texts += [pattern.label for pattern in context.patterns if pattern.language == lang]
+                for text in texts:
+                    text = normalize(text) if text else None
+                    if not text:
+                        continue
+                    # A TEXT OF SEVERAL CLASSES IS LEFT TO THE CLASSIFIER
+                    if index.get(text, label) != label:
+                        ambiguous.add(text)
+                    index[text] = label
+        for text in ambiguous:
+            del index[text]
+        return table, index
+
+    def invalidate(self, path=None):
+        """
+        Drop the tables, they will be rebuilt on the next request.
+
+        :param path: model's folder name, None drops every table
+        :return: None
+        """
+        with self._lock:
+            for key in list(self._tables):
+                if path is None or key[0] == path:
+                    del self._tables[key]
+            self.generation += 1
+
+
+context_tables = ContextTables()
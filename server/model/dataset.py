@@ -0,0 +1,145 @@
+import os
+import json
+import shutil
+import hashlib
+
+from pathlib import Path
+from server.database.models import *
+from .featurizer import tokenize
+
+# nltk.download()
+
+OUTPUT_PATH = f'{Path().absolute()}/server/model/output'
+
+ARTIFACTS = ['words_{lang}.pkl', 'classes_{lang}.pkl', 'model_{lang}.h5', 'model_{lang}.npz']
+
+# TRAINING OPTIONS CHANGING THE ARTIFACTS (checkpoint_every ONLY CHANGES HOW OFTEN THEY ARE SAVED)
+HASHED_OPTIONS = ['max_epochs', 'patience']
+
+
+def get_words(patterns):
+    """
+    Tokenize patterns
+    Remove ignored letters
+
+    :param patterns: a list of patterns
+    :return: sorted set of words
+    """
+    words = []
+    for pattern in patterns:
+        words.extend(tokenize(pattern))
+    return sorted(set(words))
+
+
+def get_dataset_hash(classes, documents, words, options=None):
+    """
+    :param classes: sorted list of labels
+    :param documents: list of (pattern, label) pairs
+    :param words: sorted set of words
+    :param options: train_model's options, only HASHED_OPTIONS are taken into account
+    :return: a hash identifying the training data of a language
+    """
+    options = {key: value for key, value in (options or dict()).items() if key in HASHED_OPTIONS and value is not None}
+    content = json.dumps([classes, sorted(map(list, documents)), words, sorted(options.items())], ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def extract_corpus(languages, options=None):
+    """
+    Retrieve the training data of every language in a single query,
+    only validated contributions are used.
+
+    :param languages: the datasets' languages
+    :param options: train_model's options, part of the datasets' hash
+    :return: a dictionary in the format of { 'lang': dataset }, see @build_dataset
+    """
+    rows = database.session.query(
+        Context.label_en,
+        Context.label_fr,
+        Context.label_ar,
+        Pattern.label,
+        Pattern.language,
+    ).join(
+        Contribution, Context.contribution_id == Contribution.id
+    ).outerjoin(
+        Pattern, Pattern.context_id == Context.id
+    ).filter(
+        Contribution.status == 'valid'
+    ).order_by(Context.id, Pattern.id).all()
+
+    corpus = dict()
+    for lang in languages:
+        column = ['en', 'fr', 'ar'].index(lang)
+        classes = set()
+        documents = []
+        for row in rows:
+            label = row[column]
+            if label is None:
+                continue
+            classes.add(label)
+            if row[4] == lang:
+                documents.append((row[3], label))
+        corpus[lang] = build_dataset(sorted(classes), documents, options)
+    return corpus
+
+
+def build_dataset(classes, documents, options=None):
+    """
+    :param classes: sorted list of labels
+    :param documents: list of (pattern, label) pairs
+    :param options: train_model's options, see @get_dataset_hash
+    :return: a dictionary in the format of { 'classes': [], 'patterns': [], 'words': [], 'documents': [], 'hash': '' }
+    """
+    patterns = [document[0] for document in documents]
+    words = get_words(patterns)
+    return {
+        'classes': classes,
+        'patterns': patterns,
+        'words': words,
+        'documents': documents,
+        'hash': get_dataset_hash(classes, documents, words, options),
+    }
+
+
+def load_dataset(lang):
+    """
+    :param lang: dataset's language
+    :return: the language's dataset, see @build_dataset
+    """
+    return extract_corpus([lang])[lang]
+
+
+def find_artifacts(lang, dataset_hash):
+    """
+    Find a saved model trained on the same data with the same options.
+
+    :param lang: model's language
+    :param dataset_hash: hash of the language's dataset and training options
+    :return: the Model record whose artifacts can be reused, None if there is none
+    """
+    for model in Model.query.order_by(Model.created_at.desc()).all():
+        if not model.datasets or model.datasets.get(lang) != dataset_hash:
+            continue
+        folder = f'{OUTPUT_PATH}/{model.path}'
+        if all(os.path.exists(f'{folder}/{artifact.format(lang=lang)}') for artifact in ARTIFACTS):
+            return model
+    return None
+
+
+def link_artifacts(source, destination, lang):
+    """
+    Make a model's artifacts available in another model's folder without copying them when possible.
+
+    :param source: source model's folder name
+    :param destination: destination model's folder name
+    :param lang: artifacts' language
+    :return: None
+    """
+    os.makedirs(f'{OUTPUT_PATH}/{destination}', exist_ok=True)
+    for artifact in ARTIFACTS:
+        source_path = f'{OUTPUT_PATH}/{source}/{artifact.format(lang=lang)}'
+        destination_path = f'{OUTPUT_PATH}/{destination}/{artifact.format(lang=lang)}'
+        try:
+            os.link(source_path, destination_path)
+        except OSError:
+            shutil.copy2(source_path, destination_path)
@@ -0,0 +1,79 @@
+import string
+import unicodedata
+import nltk
+import numpy as np
+
+from nltk.stem import WordNetLemmatizer
+
+IGNORED_LETTERS = [p for p in string.punctuation]
+
+lemmatizer = WordNetLemmatizer()
+
+
+def tokenize(sentence):
+    """
+    Tokenize a sentence,
+    remove ignored letters,
+    lemmatize the remaining words.
+
+    :param sentence: a pattern or a user's message
+    :return: a list of lemmatized words
+    """
+    return [lemmatizer.lemmatize(word) for word in nltk.word_tokenize(sentence) if word not in IGNORED_LETTERS]
+
+
+def normalize(sentence):
+    """
+    Case, punctuation (any script) and whitespace insensitive form of a sentence, used to match a message exactly.
+
+    :param sentence: a pattern, a proposition or a user's message
+    :return: the normalized sentence
+    """
+    letters = [' ' if unicodedata.category(letter).startswith('P') else letter for letter in sentence.casefold()]
+    return ' '.join(''.join(letters).split())
+
+
+class Featurizer:
+    """
+    Bag-of-words featurizer shared by training and inference.
+    The vocabulary is indexed by a dictionary so each token is resolved in O(1)
+    and the input matrix is filled in a single vectorized assignment.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self.index = {word: index for index, word in enumerate(words)}
+
+    def __len__(self):
+        return len(self.words)
+
+    def vectorize_tokens(self, documents):
+        """
+        :param documents: a list of token lists
+        :return: a (len(documents), len(words)) matrix of 0/1 values
+        """
+        rows = []
+        columns = []
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                column = self.index.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        matrix = np.zeros((len(documents), len(self.words)), dtype=np.float32)
+        matrix[rows, columns] = 1
+        return matrix
+
+    def transform(self, sentences):
+        """
+        :param sentences: a list of patterns or user's messages
+        :return: a (len(sentences), len(words)) matrix of 0/1 values
+        """
+        return self.vectorize_tokens([tokenize(sentence) for sentence in sentences])
+
+    def transform_one(self, sentence):
+        """
+        :param sentence: a pattern or a user's message
+        :return: a (1, len(words)) matrix of 0/1 values
+        """
+        return self.transform([sentence])
@@ -0,0 +1,312 @@
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from flask import Flask, current_app
+from server.database.models import *
+from server.database.notifications import publish
+from .dataset import extract_corpus, find_artifacts, link_artifacts
+
+OUTPUT_PATH = f'{Path().absolute()}/server/model/output'
+
+LANGUAGES = ['en', 'fr', 'ar']
+
+FINISHED_STATES = ['completed', 'failed', 'cancelled']
+
+JOB_ID = r'\d+(\.\d+)?'
+
+
+class TrainingCancelled(Exception):
+    pass
+
+
+def _folder(job_id):
+    return f'{OUTPUT_PATH}/{job_id}'
+
+
+def _write(path, data):
+    # WRITE THEN RENAME SO THAT READERS NEVER SEE A PARTIAL FILE, THE SERVER AND THE JOB BOTH WRITE
+    with open(f'{path}.{os.getpid()}.tmp', 'w') as file:
+        json.dump(data, file)
+    os.replace(f'{path}.{os.getpid()}.tmp', path)
+
+
+def _read(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _update_job(job_id, **values):
+    job = _read(f'{_folder(job_id)}/job.json')
+    job.update(values)
+    _write(f'{_folder(job_id)}/job.json', job)
+
+
+def update_progress(job_id, lang, **values):
+    """
+    :param job_id: the job's id
+    :param lang: the language being trained
+    :param values: progress values to save (state, epoch, epochs, ...)
+    :return: None
+    """
+    status = _read(f'{_folder(job_id)}/status_{lang}.json') or dict()
+    status.update(values)
+    _write(f'{_folder(job_id)}/status_{lang}.json', status)
+
+
+def is_cancelled(job_id):
+    return os.path.exists(f'{_folder(job_id)}/cancel')
+
+
+def submit_job(user_id, languages=None, **options):
+    """
+    Create a training job and run it in a separate process.
+
+    :param user_id: id of the user who asked for the training
+    :param languages: languages to train, all of them by default
+    :param options: train_model's options (max_epochs, patience, checkpoint_every)
+    :return: the job's id, also used as the model's folder name
+    """
+    languages = languages or LANGUAGES
+    job_id = str(time.time())
+    os.makedirs(_folder(job_id))
+    _write(f'{_folder(job_id)}/job.json', {
+        'id': job_id,
+        'userId': user_id,
+        'languages': languages,
+        'options': options,
+        'state': 'queued',
+        'createdAt': time.time(),
+        'finishedAt': None,
+        'error': None,
+        'pid': None,
+    })
+    for lang in languages:
+        update_progress(job_id, lang, state='pending', epoch=0, epochs=None)
+
+    _start(job_id)
+    return job_id
+
+
+def resume_job(job_id):
+    """
+    Restart a cancelled or failed job, its languages resume from their last checkpoint.
+
+    :param job_id: the job's id
+    :return: False if the job does not exist or is not finished
+    """
+    job = get_job(job_id)
+    if job is None or job['state'] not in ['failed', 'cancelled']:
+        return False
+    for name in ['cancel', 'pid.json']:
+        if os.path.exists(f'{_folder(job_id)}/{name}'):
+            os.remove(f'{_folder(job_id)}/{name}')
+    _update_job(job_id, state='queued', finishedAt=None, error=None)
+    _start(job_id)
+    return True
+
+
+def _start(job_id):
+    # SPAWNED, A FORK WOULD INHERIT THE SERVER'S TENSORFLOW RUNTIME (CHAT_BACKEND 'keras') AND ITS THREADS
+    process = multiprocessing.get_context('spawn').Process(
+        target=_run, args=(job_id, current_app.config['SQLALCHEMY_DATABASE_URI']), name=f'training-{job_id}'
+    )
+    process.start()
+    # A FILE OF ITS OWN, job.json IS UPDATED BY THE JOB'S PROCESS MEANWHILE
+    _write(f'{_folder(job_id)}/pid.json', process.pid)
+    # REAPS THE JOB'S PROCESS AS SOON AS IT EXITS
+    threading.Thread(target=process.join, daemon=True).start()
+
+
+def _run(job_id, uri):
+    """
+    Entry point of the job's process, which does not inherit the server's application.
+
+    :param job_id: the job's id
+    :param uri: the server's database URI
+    :return: None
+    """
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database.init_app(app)
+    with app.app_context():
+        run_job(job_id)
+
+
+def get_job(job_id):
+    """
+    :param job_id: the job's id
+    :return: the job's state and the progress of each language, None if the job does not exist
+    """
+    if not re.fullmatch(JOB_ID, job_id):
+        return None
+    job = _read(f'{_folder(job_id)}/job.json')
+    if job is None:
+        return None
+    job['pid'] = _read(f'{_folder(job_id)}/pid.json')
+    if job['state'] not in FINISHED_STATES and job['pid'] is not None and not _is_alive(job['pid']):
+        job['state'] = 'failed'
+        job['error'] = 'the training process exited unexpectedly'
+    job['progress'] = {lang: _read(f'{_folder(job_id)}/status_{lang}.json') for lang in job['languages']}
+    return job
+
+
+def cancel_job(job_id):
+    """
+    Ask a job to stop, it stops at the end of the current epoch.
+
+    :param job_id: the job's id
+    :return: False if the job does not exist
+    """
+    if not re.fullmatch(JOB_ID, job_id) or not os.path.exists(f'{_folder(job_id)}/job.json'):
+        return False
+    open(f'{_folder(job_id)}/cancel', 'w').close()
+    return True
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # AN EXITED JOB STAYS A ZOMBIE, WHICH os.kill STILL FINDS, UNTIL ITS PARENT REAPS IT
+    try:
+        with open(f'/proc/{pid}/status') as file:
+            for line in file:
+                if line.startswith('State:'):
+                    return line.split()[1] != 'Z'
+    except OSError:
+        pass
+    return True
+
+
+def train_language(job_id, lang, threads, dataset):
+    """
+    Train one language of a job.
+    Runs in a worker process of @train_languages, without touching the database.
+
+    :param job_id: the job's id
+    :param lang: the language to train
+    :param threads: TensorFlow's intra-op thread budget of this worker
+    :param dataset: the language's dataset, extracted by the job
+    :return: the language's final state
+    """
+    try:
+        if is_cancelled(job_id):
+            raise TrainingCancelled()
+        update_progress(job_id, lang, state='running', threads=threads)
+
+        # TENSORFLOW IS ONLY IMPORTED BY THE TRAINING WORKERS
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(min(2, threads))
+        from .train import train_model, TrainingProgress
+
+        options = (_read(f'{_folder(job_id)}/job.json') or dict()).get('options', dict())
+        metrics = train_model(lang, job_id, callbacks=[TrainingProgress(job_id, lang)], dataset=dataset, **options)
+        update_progress(job_id, lang, state='completed', dataset=dataset['hash'], metrics=metrics)
+        return 'completed'
+    except TrainingCancelled:
+        update_progress(job_id, lang, state='cancelled')
+        return 'cancelled'
+    except Exception as exception:
+        traceback.print_exc()
+        update_progress(job_id, lang, state='failed', error=str(exception))
+        return 'failed'
+
+
+def train_languages(job_id, datasets, workers=None):
+    """
+    Train the languages of a job in parallel, one process per language,
+    sharing the CPU cores between them so that TensorFlow does not oversubscribe the machine.
+
+    :param job_id: the job's id
+    :param datasets: a dictionary in the format of { 'lang': dataset }
+    :param workers: maximum number of worker processes, one per language by default
+    :return: a dictionary in the format of { 'lang': 'final state' }
+    """
+    if not datasets:
+        return dict()
+    workers = min(workers or len(datasets), len(datasets))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # SPAWNED, TENSORFLOW'S THREADING CAN ONLY BE CONFIGURED BEFORE ITS RUNTIME IS INITIALIZED
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            lang: executor.submit(train_language, job_id, lang, threads, dataset)
+            for lang, dataset in datasets.items()
+        }
+        return {lang: future.result() for lang, future in futures.items()}
+
+
+def reuse_artifacts(job_id, lang, dataset):
+    """
+    Link the artifacts of the model trained on the same dataset, if any.
+
+    :param job_id: the job's id
+    :param lang: the dataset's language
+    :param dataset: the language's dataset
+    :return: True if the language does not need to be trained
+    """
+    source = find_artifacts(lang, dataset['hash'])
+    if source is None:
+        return False
+    link_artifacts(source.path, job_id, lang)
+    metrics = dict((source.metrics or dict()).get(lang) or dict(), reusedFrom=source.path)
+    update_progress(job_id, lang, state='completed', dataset=dataset['hash'], metrics=metrics)
+    return True
+
+
+def run_job(job_id):
+    """
+    Extract the training data, train every language of a job, then save the model record.
+    Runs in the job's process, within an application context.
+
+    :param job_id: the job's id
+    :return: None
+    """
+    job = _read(f'{_folder(job_id)}/job.json')
+    _update_job(job_id, state='running')
+    try:
+        # A RESUMED JOB DOES NOT TRAIN AGAIN THE LANGUAGES IT ALREADY COMPLETED
+        progress = {lang: _read(f'{_folder(job_id)}/status_{lang}.json') for lang in job['languages']}
+        languages = [lang for lang in job['languages'] if progress[lang]['state'] != 'completed']
+
+        # ONE QUERY FOR EVERY LANGUAGE, AN UNCHANGED DATASET REUSES ITS ARTIFACTS
+        corpus = extract_corpus(languages, job.get('options'))
+        datasets = {lang: corpus[lang] for lang in languages if not reuse_artifacts(job_id, lang, corpus[lang])}
+        states = train_languages(job_id, datasets)
+        if 'failed' in states.values():
+            failed = [lang for lang, state in states.items() if state == 'failed']
+            _update_job(job_id, state='failed', finishedAt=time.time(), error=f'training failed for {failed}')
+            return
+        if 'cancelled' in states.values():
+            _update_job(job_id, state='cancelled', finishedAt=time.time())
+            return
+
+        # SAVE MODEL RECORD
+        progress = {lang: _read(f'{_folder(job_id)}/status_{lang}.json') for lang in job['languages']}
+        database.session.add(Model(
+            path=job_id,
+            user_id=job['userId'],
+            metrics={lang: status['metrics'] for lang, status in progress.items()},
+            datasets={lang: status['dataset'] for lang, status in progress.items()},
+        ))
+        # THE SERVING PROCESSES REFRESH THEIR MODELS LISTING
+        publish('models_added')
+        database.session.commit()
+        _update_job(job_id, state='completed', finishedAt=time.time())
+    except Exception as exception:
+        traceback.print_exc()
+        _update_job(job_id, state='failed', finishedAt=time.time(), error=str(exception))
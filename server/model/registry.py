@@ -0,0 +1,275 @@
+import os
+import pickle
+import threading
+import time
+
+from pathlib import Path
+from .featurizer import Featurizer
+from .backend import NumpyModel
+from .batching import MicroBatcher, settings as batching
+
+OUTPUT_PATH = f'{Path().absolute()}/server/model/output'
+
+
+class ModelBundle:
+    """
+    Everything needed to answer a chat message for one (model path, language) pair.
+    """
+
+    def __init__(self, path, lang, model, words, classes):
+        self.path = path
+        self.lang = lang
+        self.model = model
+        self.words = words
+        self.classes = classes
+        self.featurizer = Featurizer(words)
+        self.batcher = None
+        if batching['enabled']:
+            self.batcher = MicroBatcher(model.predict, batching['window'], batching['max_batch_size'])
+
+    def predict(self, inputs):
+        """
+        :param inputs: a (n, len(words)) matrix
+        :return: the model's output, computed with other concurrent requests when batching is enabled
+        """
+        if self.batcher is None:
+            return self.model.predict(inputs)
+        return self.batcher.submit(inputs)
+
+    def warm(self):
+        """
+        Run one forward pass so that the first chat message does not pay for the lazy initializations
+        (lemmatizer data, Keras graph).
+
+        :return: None
+        """
+        self.predict(self.featurizer.transform_one(' '.join(self.words[:3])))
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+class ModelRegistry:
+    """
+    Keeps loaded models in memory so that chat requests never touch the disk
+    once a (model path, language) bundle has been loaded.
+
+    With the 'numpy' backend, models exported by train_model are served without importing TensorFlow,
+    the 'keras' backend (or a model trained before the export existed) loads the .h5 file.
+    With @mmap, the NumPy weights are memory-mapped so that processes serving the same model share them.
+
+    The serving pointer maps each tag to the path of the model answering it,
+    it is swapped in one assignment by @promote once the new model is loaded and warmed.
+    While a promotion of a tag is pending (@begin_promotion), its pointer neither expires nor is refreshed
+    from the database, which already names the model being loaded.
+    """
+
+    # SECONDS A POINTER READ FROM THE DATABASE IS TRUSTED, OTHER PROCESSES MAY HAVE PROMOTED A MODEL SINCE
+    SERVING_TTL = 5.
+
+    def __init__(self, backend='keras', mmap=False):
+        self.backend = backend
+        self.mmap = mmap
+        self._bundles = {}
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._serving = {}
+        self._pending = {}
+        self.generation = 0
+        self._counters_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_time = 0.
+
+    def get(self, path, lang):
+        """
+        :param path: model's folder name (Model.path)
+        :param lang: model's language
+        :return: the cached bundle, loaded from the disk on the first call
+        """
+        key = (path, lang)
+        bundle = self._bundles.get(key)
+        if bundle is not None:
+            self._count(hits=1)
+            return bundle
+
+        # ONLY ONE THREAD LOADS A GIVEN BUNDLE, THE OTHERS WAIT FOR IT
+        with self._lock:
+            bundle = self._bundles.get(key)
+            if bundle is not None:
+                self._count(hits=1)
+                return bundle
+            self._count(misses=1)
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            bundle = self._bundles.get(key)
+            if bundle is None:
+                bundle = self._load(path, lang)
+                with self._lock:
+                    self._bundles[key] = bundle
+                    self._loading.pop(key, None)
+        return bundle
+
+    def _count(self, hits=0, misses=0):
+        # A DEDICATED LOCK, THE HITS DO NOT CONTEND WITH THE LOADS
+        with self._counters_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _load(self, path, lang):
+        start = time.monotonic()
+
+        folder = f'{OUTPUT_PATH}/{path}'
+        with open(f'{folder}/words_{lang}.pkl', 'rb') as file:
+            words = pickle.load(file)
+        with open(f'{folder}/classes_{lang}.pkl', 'rb') as file:
+            classes = pickle.load(file)
+        if self.backend == 'numpy' and os.path.exists(f'{folder}/model_{lang}.npz'):
+            model = NumpyModel.load(f'{folder}/model_{lang}.npz', mmap=self.mmap)
+        else:
+            from tensorflow.keras.models import load_model
+            model = load_model(f'{folder}/model_{lang}.h5')
+
+        with self._counters_lock:
+            self.loads += 1
+            self.load_time += time.monotonic() - start
+        return ModelBundle(path=path, lang=lang, model=model, words=words, classes=classes)
+
+    def preload(self, paths, languages):
+        """
+        Load bundles ahead of the first request, e.g. in a server's master process before it forks its workers.
+        Only models having a NumPy artifact are loaded with the 'numpy' backend:
+        TensorFlow must not be initialized in a process that forks.
+
+        :param paths: models' folder names (Model.path)
+        :param languages: models' languages
+        :return: the loaded bundles
+        """
+        bundles = []
+        if self.backend != 'numpy':
+            return bundles
+        for path in paths:
+            for lang in languages:
+                if not os.path.exists(f'{OUTPUT_PATH}/{path}/model_{lang}.npz'):
+                    print(f'{path}/{lang} has no NumPy artifact, it is loaded on the first request')
+                    continue
+                try:
+                    bundles.append(self.get(path, lang))
+                except Exception as exception:
+                    print(exception)
+        return bundles
+
+    def serving(self, tag):
+        """
+        :param tag: 'dev' or 'prod'
+        :return: the path of the model serving the tag, None if it is unknown (read it from the database)
+        """
+        entry = self._serving.get(tag)
+        if entry is None or (entry[1] < time.monotonic() and tag not in self._pending):
+            return None
+        return entry[0]
+
+    def serve(self, tag, path, generation):
+        """
+        Remember the model of a tag read from the database.
+
+        :param tag: 'dev' or 'prod'
+        :param path: model's folder name (Model.path)
+        :param generation: @generation before the database was read, the pointer is not kept if it changed since
+        :return: None
+        """
+        with self._lock:
+            if generation == self.generation and tag not in self._pending:
+                self._serving = dict(self._serving, **{tag: (path, time.monotonic() + self.SERVING_TTL)})
+
+    def begin_promotion(self, tag, path):
+        """
+        Keep serving @tag with its current model until @promote swaps it to @path.
+
+        :param tag: 'dev' or 'prod'
+        :param path: the promoted model's folder name (Model.path)
+        :return: None
+        """
+        with self._lock:
+            self._pending[tag] = path
+
+    def end_promotion(self, tag, path):
+        """
+        Release the pointer of @tag if the promotion to @path did not swap it (failed promotion).
+
+        :param tag: 'dev' or 'prod'
+        :param path: the promoted model's folder name (Model.path)
+        :return: None
+        """
+        with self._lock:
+            if self._pending.get(tag) == path:
+                del self._pending[tag]
+
+    def promote(self, tag, path, languages):
+        """
+        Load and warm a model, then swap the serving pointer of @tag to it,
+        the requests already running keep the bundles of the previous model.
+
+        :param tag: 'dev' or 'prod'
+        :param path: model's folder name (Model.path)
+        :param languages: model's languages
+        :return: the path of the model previously serving the tag, None if there was none
+        """
+        for lang in languages:
+            try:
+                self.get(path, lang).warm()
+            except Exception as exception:
+                # THE LANGUAGE FAILS ON ITS FIRST REQUEST AS IT WOULD WITHOUT PROMOTION
+                print(exception)
+        with self._lock:
+            previous = self._serving.get(tag)
+            serving = {key: entry for key, entry in self._serving.items() if entry[0] != path}
+            serving[tag] = (path, time.monotonic() + self.SERVING_TTL)
+            self._serving = serving
+            # A LATER PROMOTION OF THE TAG STAYS PENDING
+            if self._pending.get(tag) == path:
+                del self._pending[tag]
+            self.generation += 1
+        return previous[0] if previous else None
+
+    def invalidate(self, path=None):
+        """
+        Drop cached bundles, they will be reloaded on the next request,
+        and the serving pointers to them.
+
+        :param path: model's folder name, None drops every bundle
+        :return: None
+        """
+        with self._lock:
+            for key in list(self._bundles):
+                if path is None or key[0] == path:
+                    self._bundles.pop(key).close()
+            self._serving = {
+                key: entry for key, entry in self._serving.items() if path is not None and entry[0] != path
+            }
+            self.generation += 1
+
+    def stats(self):
+        """
+        :return: the registry counters
+        """
+        with self._counters_lock:
+            hits, misses, loads, load_time = self.hits, self.misses, self.loads, self.load_time
+        return {
+            'hits': hits,
+            'misses': misses,
+            'loads': loads,
+            'loadTime': load_time,
+            'backend': self.backend,
+            'serving': {tag: self.serving(tag) for tag in self._serving},
+            'pendingPromotions': dict(self._pending),
+            'bundles': [f'{path}/{lang}' for path, lang in self._bundles],
+            'batches': sum(bundle.batcher.batches for bundle in self._bundles.values() if bundle.batcher),
+            'batchedRequests': sum(bundle.batcher.requests for bundle in self._bundles.values() if bundle.batcher),
+        }
+
+
+registry = ModelRegistry()
@@ -1,146 +1,215 @@
 import os
-import random
-import string
+import json
 import pickle
+import zlib
 import numpy as np
-import nltk
 import time
 
 from pathlib import Path
-from server.database.models import *
-from nltk.stem import WordNetLemmatizer
+from .featurizer import Featurizer
+from .backend import export_weights
+from .dataset import load_dataset
 
-from tensorflow.keras.models import Sequential
+from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import Dense, Dropout
 from tensorflow.keras.optimizers import Nadam
 from tensorflow.keras.losses import BinaryCrossentropy
+from tensorflow.keras.callbacks import Callback, EarlyStopping
+from .jobs import TrainingCancelled, is_cancelled, update_progress
 
-# nltk.download()
+MAX_EPOCHS = 750
+PATIENCE = 50
+CHECKPOINT_EVERY = 25
 
-IGNORED_LETTERS = [p for p in string.punctuation]
 
-lemmatizer = WordNetLemmatizer()
-
-
-def get_classes(lang):
+class TrainingProgress(Callback):
     """
-    Retrieve contexts' labels from the database
-
-    :param lang: label's language
-    :return: a sorted list of labels
+    Reports the epochs of a training job and stops it when the job is cancelled.
     """
-    classes = []
-    if lang == 'en':
-        classes = [context[0] for context in Context.query.with_entities(Context.label_en).all()]
-    elif lang == 'fr':
-        classes = [context[0] for context in Context.query.with_entities(Context.label_fr).all()]
-    elif lang == 'ar':
-        classes = [context[0] for context in Context.query.with_entities(Context.label_ar).all()]
-    return sorted(classes)
 
+    REPORT_INTERVAL = 1.
 
-def get_patterns(lang):
-    """
-    Retrieve contexts' patterns from the database
+    def __init__(self, job_id, lang):
+        super().__init__()
+        self.job_id = job_id
+        self.lang = lang
+        self.reported_at = 0.
 
-    :param lang: patterns' language
-    :return: a list of patterns
-    """
-    return [pattern[0]
-            for pattern in
-            Pattern.query.with_entities(Pattern.label, Pattern.language).filter(Pattern.language == lang).all()]
+    def on_train_begin(self, logs=None):
+        update_progress(self.job_id, self.lang, epoch=0, epochs=self.params['epochs'])
 
+    def on_epoch_end(self, epoch, logs=None):
+        if is_cancelled(self.job_id):
+            raise TrainingCancelled()
+        if time.monotonic() - self.reported_at >= self.REPORT_INTERVAL or epoch + 1 == self.params['epochs']:
+            self.reported_at = time.monotonic()
+            update_progress(self.job_id, self.lang, epoch=epoch + 1,
+                            loss=float(logs.get('loss', 0)), accuracy=float(logs.get('accuracy', 0)))
 
-def get_words(patterns):
-    """
-    Tokenize patterns
-    Remove ignored letters
 
-    :param patterns: a list of patterns
-    :return: sorted set of words
+class ResumableEarlyStopping(EarlyStopping):
+    """
+    EarlyStopping whose state (best validation loss, best weights, epochs without improvement)
+    can be restored from a checkpoint, Keras resets it at the beginning of every fit.
     """
-    words = []
-    for pattern in patterns:
-        words.extend(nltk.word_tokenize(pattern))
-    words = [lemmatizer.lemmatize(word) for word in words if word not in IGNORED_LETTERS]
-    return sorted(set(words))
+
+    def __init__(self, state=None, **kwargs):
+        super().__init__(**kwargs)
+        self.initial_state = state
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if self.initial_state is not None:
+            self.wait = self.initial_state['wait']
+            self.best = self.initial_state['best']
+            self.best_weights = self.initial_state['bestWeights']
+            if hasattr(self, 'best_epoch'):
+                self.best_epoch = self.initial_state['bestEpoch']
 
 
-def get_label(lang, context):
+class Checkpoint(Callback):
     """
-    :param lang: label's language
-    :param context: Context object
-    :return: context's label based on the specified language
+    Saves the model and the training state (elapsed time, early stopping state and best weights)
+    every few epochs so that an interrupted training can resume where it stopped.
     """
-    label = ''
-    if lang == 'en':
-        label = context.label_en
-    elif lang == 'fr':
-        label = context.label_fr
-    elif lang == 'ar':
-        label = context.label_ar
-    return label
 
-
-def train_model(lang, folder_name):
+    def __init__(self, path, lang, every, early_stopping):
+        super().__init__()
+        self.model_path = f'{path}/checkpoint_{lang}.h5'
+        self.state_path = f'{path}/checkpoint_{lang}.json'
+        self.weights_path = f'{path}/checkpoint_{lang}_best.npz'
+        self.every = every
+        self.early_stopping = early_stopping
+        self.elapsed = 0.
+        self.started_at = time.monotonic()
+
+    def on_train_begin(self, logs=None):
+        self.started_at = time.monotonic()
+
+    def on_epoch_end(self, epoch, logs=None):
+        if (epoch + 1) % self.every == 0:
+            self.model.save(self.model_path)
+            best_weights = self.early_stopping.best_weights
+            if best_weights is not None:
+                np.savez(self.weights_path, *best_weights)
+            elif os.path.exists(self.weights_path):
+                os.remove(self.weights_path)
+            with open(self.state_path, 'w') as file:
+                json.dump({
+                    'epoch': epoch + 1,
+                    'elapsed': self.elapsed + time.monotonic() - self.started_at,
+                    'wait': self.early_stopping.wait,
+                    'best': float(self.early_stopping.best),
+                    'bestEpoch': getattr(self.early_stopping, 'best_epoch', 0),
+                }, file)
+
+    def load(self):
+        """
+        :return: the saved training state, None if there is no checkpoint
+        """
+        if not os.path.exists(self.state_path) or not os.path.exists(self.model_path):
+            return None
+        with open(self.state_path) as file:
+            state = json.load(file)
+        # A CHECKPOINT WRITTEN WITHOUT THE EARLY STOPPING STATE CANNOT BE RESUMED FAITHFULLY
+        if 'wait' not in state:
+            return None
+        state['bestWeights'] = None
+        if os.path.exists(self.weights_path):
+            with np.load(self.weights_path) as weights:
+                state['bestWeights'] = [weights[f'arr_{index}'] for index in range(len(weights.files))]
+        return state
+
+    def clear(self):
+        for path in [self.model_path, self.state_path, self.weights_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def train_model(lang, folder_name, callbacks=None, max_epochs=MAX_EPOCHS, patience=PATIENCE,
+                checkpoint_every=CHECKPOINT_EVERY, dataset=None):
     """
     Prepare data,
     save words/classes,
-    train model,
+    train model until the validation loss stops improving,
     save model.
 
-    :return: None
+    :param lang: model's language
+    :param folder_name: model's folder name (Model.path)
+    :param callbacks: Keras callbacks, used to report the progress of a training job
+    :param max_epochs: maximum number of epochs
+    :param patience: number of epochs without improvement of the validation loss before stopping
+    :param checkpoint_every: number of epochs between two checkpoints
+    :param dataset: the language's dataset (@load_dataset), loaded from the database by default
+    :return: a dictionary in the format of { 'epochs': 0, 'bestValLoss': 0, 'trainingTime': 0 }
     """
 
     # PREPARE DATA
-    classes = get_classes(lang=lang)
-    patterns = get_patterns(lang)
-    words = get_words(patterns)
-
-    # GENERATE DOCUMENTS
-    documents = []
-    for context in Context.query.all():
-        for pattern in filter(lambda p: p.language == lang, context.patterns):
-            documents.append((nltk.word_tokenize(pattern.label), get_label(lang, context)))
+    dataset = dataset or load_dataset(lang)
+    classes = dataset['classes']
+    words = dataset['words']
+    documents = dataset['documents']
 
     # PREPARE TRAINING DATA
-    training = []
-    for document in documents:
-        input_representation = np.zeros(len(words))
-        output_representation = np.zeros(len(classes))
-        for word in words:
-            if word in document[0]:
-                input_representation[words.index(word)] = 1
-        output_representation[classes.index(document[1])] = 1
-        training.append([input_representation, output_representation])
-
-    random.shuffle(training)
-    training = np.array(training)
-
-    train_x = list(training[:, 0])
-    train_y = list(training[:, 1])
+    featurizer = Featurizer(words)
+    class_index = {label: index for index, label in enumerate(classes)}
+
+    train_x = featurizer.transform([document[0] for document in documents])
+    train_y = np.zeros((len(documents), len(classes)), dtype=np.float32)
+    train_y[np.arange(len(documents)), [class_index[document[1]] for document in documents]] = 1
+
+    # THE SHUFFLE ONLY DEPENDS ON THE FOLDER SO THAT A RESUMED TRAINING KEEPS THE SAME VALIDATION SPLIT
+    permutation = np.random.RandomState(zlib.crc32(f'{folder_name}/{lang}'.encode())).permutation(len(documents))
+    train_x = train_x[permutation]
+    train_y = train_y[permutation]
 
     # SAVE WORDS/CLASSES
     path = f'server/model/output/{folder_name}'
-    if not os.path.exists(path):
-        os.mkdir(path)
+    os.makedirs(path, exist_ok=True)
     pickle.dump(words, open(f'{Path().absolute()}/{path}/words_{lang}.pkl', 'wb'))
     pickle.dump(classes, open(f'{Path().absolute()}/{path}/classes_{lang}.pkl', 'wb'))
 
-    # CREATE/TRAIN/SAVE MODEL
+    # CREATE/RESUME MODEL
+    early_stopping = ResumableEarlyStopping(monitor='val_loss', patience=patience, restore_best_weights=True)
+    checkpoint = Checkpoint(f'{Path().absolute()}/{path}', lang, checkpoint_every, early_stopping)
+    state = checkpoint.load()
+    model = None
+    if state is not None:
+        model = load_model(checkpoint.model_path)
+        # THE CORPUS CHANGED SINCE THE CHECKPOINT, START OVER
+        if model.input_shape[1] != train_x.shape[1] or model.output_shape[1] != train_y.shape[1]:
+            model = None
+    if model is None:
+        state = {'epoch': 0, 'elapsed': 0.}
+        model = Sequential()
+
+        model.add(Dense(128, input_shape=(train_x.shape[1],)))
+        model.add(Dropout(.8))
+        model.add(Dense(512, activation='relu'))
+        model.add(Dropout(.8))
+        model.add(Dense(train_y.shape[1], activation='softmax'))
+
+        model.compile(loss=BinaryCrossentropy(), optimizer=Nadam(learning_rate=0.001), metrics=['accuracy'])
+    else:
+        early_stopping.initial_state = state
+    checkpoint.elapsed = state['elapsed']
+
+    # TRAIN MODEL
     start = time.monotonic()
-    model = Sequential()
-
-    model.add(Dense(128, input_shape=(len(train_x[0]),)))
-    model.add(Dropout(.8))
-    model.add(Dense(512, activation='relu'))
-    model.add(Dropout(.8))
-    model.add(Dense(len(train_y[0]), activation='softmax'))
-
-    model.compile(loss=BinaryCrossentropy(), optimizer=Nadam(learning_rate=0.001), metrics=['accuracy'])
-    result = model.fit(x=np.array(train_x), y=np.array(train_y), validation_split=.10, batch_size=32, epochs=750,
-                       verbose=0, shuffle=True)
-
-    print(time.monotonic() - start)
-
+    result = model.fit(x=train_x, y=train_y, validation_split=.10, batch_size=32, epochs=max_epochs,
+                       initial_epoch=state['epoch'], verbose=0, shuffle=True,
+                       callbacks=[early_stopping, checkpoint] + (callbacks or []))
+    # KERAS ONLY RESTORES THE BEST WEIGHTS WHEN IT STOPS EARLY, THE SAVED MODEL MUST BE THE ONE OF bestValLoss
+    if early_stopping.best_weights is not None:
+        model.set_weights(early_stopping.best_weights)
+
+    # SAVE MODEL
     model.save(f'{Path().absolute()}/{path}/model_{lang}.h5', result)
+    export_weights(model, f'{Path().absolute()}/{path}/model_{lang}.npz')
+    checkpoint.clear()
+
+    return {
+        'epochs': state['epoch'] + len(result.epoch),
+        'bestValLoss': float(early_stopping.best) if early_stopping.best_weights is not None else None,
+        'trainingTime': state['elapsed'] + time.monotonic() - start,
+    }
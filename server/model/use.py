@@ -1,50 +1,25 @@
+import os
 import random
-import pickle
-import nltk
-import numpy as np
-from pathlib import Path
-from nltk.stem import WordNetLemmatizer
-from tensorflow.keras.models import load_model
+import threading
+import time
 from server.database.models import *
+from .registry import registry
+from .featurizer import normalize
+from .contexts import context_tables
 
 ERROR_THRESHOLD = 0.25
 
-lemmatizer = WordNetLemmatizer()
+# EXACT-MATCH FAST PATH COUNTERS OF THIS PROCESS, TIMES IN SECONDS, UPDATED BY CONCURRENT REQUESTS
+exact_match = {
+    'lookups': 0,
+    'hits': 0,
+    'hitTime': 0.,
+    'classifierTime': 0.,
+}
+exact_match_lock = threading.Lock()
 
 
-def get_label(lang, context):
-    """
-    :param lang: label's language
-    :param context: Context object
-    :return: context's label based on the specified language
-    """
-    label = None
-    if lang == 'en':
-        label = context.label_en
-    if lang == 'fr':
-        label = context.label_fr
-    if lang == 'ar':
-        label = context.label_ar
-    return label
-
-
-def get_proposition(lang, context):
-    """
-    :param lang: proposition's language
-    :param context: Context object
-    :return: context's proposition based on the specified language
-    """
-    proposition = None
-    if lang == 'en':
-        proposition = context.proposition_en
-    if lang == 'fr':
-        proposition = context.proposition_fr
-    if lang == 'ar':
-        proposition = context.proposition_ar
-    return proposition
-
-
-def predict_class(user_input, model, words, classes):
+def predict_class(user_input, model, featurizer, classes):
     """
     Takes the user input,
     transform it to numeric values,
@@ -52,19 +27,14 @@ def predict_class(user_input, model, words, classes):
     finally return each class with its respective probability.
 
     :param user_input: user's message
-    :param model: loaded model
-    :param words: list of words used while training the model
+    :param model: loaded model, or a registry bundle batching concurrent predictions
+    :param featurizer: featurizer built from the words used while training the model
     :param classes: list of classes used while training the model
     :return: a dictionary in the format of { 'class': '', 'probability': '' }
     """
-    input_words = [lemmatizer.lemmatize(word) for word in nltk.word_tokenize(user_input)]
-    input_representation = np.zeros(len(words))
-    for input_word in input_words:
-        for index, word in enumerate(words):
-            if input_word == word:
-                input_representation[index] = 1
+    input_representation = featurizer.transform_one(user_input)
     probabilities = []
-    for index, probability in enumerate(model.predict(np.array([input_representation]))[0]):
+    for index, probability in enumerate(model.predict(input_representation)[0]):
         if probability > ERROR_THRESHOLD:
             probabilities.append([index, probability])
     probabilities.sort(key=lambda x: x[1], reverse=True)
@@ -79,7 +49,7 @@ def predict_class(user_input, model, words, classes):
 
 def generate_response(user_input, lang, tag):
     """
-    Loads model/data based on the user's preferred language from the database,
+    Gets model/data based on the user's preferred language from the registry,
     call @predict_class function,
     generate a response randomly using the 'label' related to the highest probability.
 
@@ -88,27 +58,69 @@ def generate_response(user_input, lang, tag):
     :return: an object containing the response and the recommended prepositions
     """
 
-    m = Model.query.filter_by(state='enabled', tag=tag).first()
-
-    if m is None:
-        raise ModuleNotFoundError()
-
-    # LOAD NECESSARY DATA
-    words = pickle.load(open(f'{Path().absolute()}/server/model/output/{m.path}/words_{lang}.pkl', 'rb'))
-    classes = pickle.load(open(f'{Path().absolute()}/server/model/output/{m.path}/classes_{lang}.pkl', 'rb'))
-    # LOAD MODEL
-    model = load_model(f'{Path().absolute()}/server/model/output/{m.path}/model_{lang}.h5')
-    # PREDICT CLASS
-    predictions = predict_class(user_input, model, words, classes)
+    # THE SERVING POINTER SPARES A QUERY PER MESSAGE, THE DATABASE IS READ WHEN IT IS UNKNOWN OR EXPIRED
+    path = registry.serving(tag)
+    if path is None:
+        generation = registry.generation
+        m = Model.query.filter_by(state='enabled', tag=tag).first()
+
+        if m is None:
+            raise ModuleNotFoundError()
+
+        path = m.path
+        registry.serve(tag, path, generation)
+
+    # GET MODEL/DATA FROM THE REGISTRY
+    bundle = registry.get(path, lang)
+    # A KNOWN PATTERN/PROPOSITION IS ANSWERED WITHOUT THE CLASSIFIER
+    start = time.perf_counter()
+    label = context_tables.exact(path, lang, bundle.classes).get(normalize(user_input))
+    if label is not None:
+        elapsed = time.perf_counter() - start
+        with exact_match_lock:
+            exact_match['lookups'] += 1
+            exact_match['hits'] += 1
+            exact_match['hitTime'] += elapsed
+    else:
+        # PREDICT CLASS
+        predictions = predict_class(user_input, bundle, bundle.featurizer, bundle.classes)
+        label = predictions[0]['class']
+        elapsed = time.perf_counter() - start
+        with exact_match_lock:
+            exact_match['lookups'] += 1
+            exact_match['classifierTime'] += elapsed
+    # LOOK UP RESPONSES/PROPOSITIONS
+    table = context_tables.get(path, lang, bundle.classes)
     response = 'Error'
-    next_contexts = []
-    for context in Context.query.all():
-        if get_label(lang=lang, context=context) == predictions[0]['class']:
-            responses = list(filter(lambda x: x.language == lang, context.responses))
-            response = random.choice(responses).label
-            next_contexts = context.contexts
+    propositions = []
+    if label in table:
+        responses, propositions = table[label]
+        response = random.choice(responses)
 
     return {
         'response': response,
-        'propositions': list(map(lambda x: get_proposition(lang=lang, context=x), next_contexts))
+        'propositions': propositions
+    }
+
+
+def exact_match_stats():
+    """
+    :return: the hit rate of the exact-match fast path, the mean latency of both paths (ms)
+             and the time saved by the hits (s), estimated with the mean latency of the classifier,
+             counted by this process (pid)
+    """
+    with exact_match_lock:
+        counters = dict(exact_match)
+    hits = counters['hits']
+    misses = counters['lookups'] - hits
+    hit_latency = counters['hitTime'] / hits if hits else None
+    classifier_latency = counters['classifierTime'] / misses if misses else None
+    return {
+        'pid': os.getpid(),
+        'lookups': counters['lookups'],
+        'hits': hits,
+        'hitRate': hits / counters['lookups'] if counters['lookups'] else None,
+        'hitLatency': hit_latency * 1e3 if hit_latency is not None else None,
+        'classifierLatency': classifier_latency * 1e3 if classifier_latency is not None else None,
+        'timeSaved': hits * (classifier_latency - hit_latency) if hits and misses else None,
     }